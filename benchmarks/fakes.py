@@ -0,0 +1,321 @@
+# Import necessary libraries and modules
+import re
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+# Distributions
+class LatencyModel:
+    """Log-normal latency around `median_ms`; `sigma` controls the tail."""
+
+    def __init__(self, median_ms: float, sigma: float = 0.3):
+        self.median_ms = median_ms
+        self.sigma = sigma
+
+    def sample(self) -> float:
+        return self.median_ms * math.exp(random.gauss(0.0, self.sigma)) / 1000.0
+
+    async def wait(self) -> None:
+        if self.median_ms > 0:
+            await asyncio.sleep(self.sample())
+
+
+class SizeModel:
+    """Log-normal integer size (items, bytes, tokens) around `median`."""
+
+    def __init__(self, median: int, sigma: float = 0.3, minimum: int = 1):
+        self.median = median
+        self.sigma = sigma
+        self.minimum = minimum
+
+    def sample(self) -> int:
+        return max(self.minimum, int(round(self.median * math.exp(random.gauss(0.0, self.sigma)))))
+
+
+def filler(size: int) -> str:
+    words = ("memoria", "latency", "stream", "vector", "session", "token", "cache", "batch")
+    text = " ".join(random.choice(words) for _ in range(size // 7 + 1))
+    return text[:size]
+
+
+# Groq / OpenAI-compatible Chat Completions Stub
+class ChatCompletionsStub:
+    """
+    Scripted chat completions. For each user turn, step k issues the tool calls
+    in `tool_plan[k]` (all in one response, like a parallel plan) and, once the
+    plan is exhausted, streams a final answer of `answer_tokens` tokens.
+    The user id is taken from "I am <id>." in the user message.
+    """
+
+    def __init__(
+        self,
+        latency: LatencyModel,
+        answer_tokens: SizeModel,
+        token_interval_ms: float = 5.0,
+        tool_plan: Optional[List[List[str]]] = None
+    ):
+        self.latency = latency
+        self.answer_tokens = answer_tokens
+        self.token_interval = token_interval_ms / 1000.0
+        self.tool_plan = tool_plan if tool_plan is not None else [["get_memories", "web_search"]]
+        self.requests = 0
+        self.tool_calls_issued = 0
+
+    def _plan_step(self, messages: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        last_user = max(i for i, m in enumerate(messages) if m.get("role") == "user")
+        step = sum(1 for m in messages[last_user:] if m.get("role") == "assistant" and m.get("tool_calls"))
+        if step >= len(self.tool_plan):
+            return None
+
+        user_text = str(messages[last_user].get("content") or "")
+        match = re.search(r"I am ([\w-]+)\.", user_text)
+        user_id = match.group(1) if match else "user-anonymous"
+        arguments = {
+            "get_memories":       {"user_id": user_id},
+            "web_search":         {"query": user_text},
+            "search_memories_v2": {"query": user_text, "filters": {"user_id": user_id}},
+            "add_longterm_memory": {"messages": [{"role": "user", "content": user_text}], "user_id": user_id},
+            "web_search_batch":   {"queries": [user_text, f"{user_text} latest news"]},
+            "get_memories_batch": {"user_ids": [user_id, "user-anonymous"]},
+        }
+        return [
+            {
+                "index": i,
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments.get(name, {}))},
+            }
+            for i, name in enumerate(self.tool_plan[step])
+        ]
+
+    def _chunk(self, completion_id: str, model: str, delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    async def handle(self, request: Request):
+        body = await request.json()
+        self.requests += 1
+        tool_calls = self._plan_step(body.get("messages", []))
+        if tool_calls:
+            self.tool_calls_issued += len(tool_calls)
+        answer = [f"word{i} " for i in range(self.answer_tokens.sample())]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "stub")
+
+        # Time to first token
+        await self.latency.wait()
+
+        if not body.get("stream"):
+            message: Dict[str, Any] = {"role": "assistant", "content": None if tool_calls else "".join(answer)}
+            if tool_calls:
+                message["tool_calls"] = [{k: v for k, v in call.items() if k != "index"} for call in tool_calls]
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(answer), "total_tokens": len(answer)},
+            })
+
+        async def events():
+            if tool_calls:
+                yield self._chunk(completion_id, model, {"role": "assistant", "content": None, "tool_calls": tool_calls})
+                yield self._chunk(completion_id, model, {}, "tool_calls")
+            else:
+                yield self._chunk(completion_id, model, {"role": "assistant", "content": ""})
+                for token in answer:
+                    if self.token_interval:
+                        await asyncio.sleep(self.token_interval)
+                    yield self._chunk(completion_id, model, {"content": token})
+                yield self._chunk(completion_id, model, {}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# Tavily Search Stub
+class TavilyStub:
+    """POST /search returning `results` hits of `content_bytes` each."""
+
+    def __init__(self, latency: LatencyModel, results: SizeModel, content_bytes: SizeModel):
+        self.latency = latency
+        self.results = results
+        self.content_bytes = content_bytes
+        self.requests = 0
+
+    async def handle(self, request: Request):
+        body = await request.json()
+        self.requests += 1
+        await self.latency.wait()
+        query = body.get("query", "")
+        return JSONResponse({
+            "query": query,
+            "answer": None,
+            "images": [],
+            "results": [
+                {
+                    "title": f"Result {i} for {query[:40]}",
+                    "url": f"https://example.com/{i}",
+                    "content": filler(self.content_bytes.sample()),
+                    "score": round(1.0 - i * 0.05, 3),
+                    "raw_content": None,
+                }
+                for i in range(self.results.sample())
+            ],
+            "response_time": self.latency.median_ms / 1000.0,
+        })
+
+
+# mem0 Platform API Stub
+class Mem0Stub:
+    """
+    In-memory stand-in for the mem0 REST endpoints used by MemoryClient/AsyncMemoryClient.
+    Unknown users are seeded with `seed_memories` memories of `memory_bytes` each.
+    """
+
+    def __init__(self, latency: LatencyModel, seed_memories: SizeModel, memory_bytes: SizeModel):
+        self.latency = latency
+        self.seed_memories = seed_memories
+        self.memory_bytes = memory_bytes
+        self.requests: Counter = Counter()
+        self.memories: Dict[str, Dict[str, Any]] = {}
+        self.seeded: set = set()
+
+    def _new_memory(self, text: str, user_id: Optional[str], **extra) -> Dict[str, Any]:
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        memory = {
+            "id": str(uuid.uuid4()),
+            "memory": text,
+            "user_id": user_id,
+            "metadata": None,
+            "categories": [],
+            "created_at": now,
+            "updated_at": now,
+            **extra,
+        }
+        self.memories[memory["id"]] = memory
+        return memory
+
+    def _for_user(self, user_id: Optional[str]) -> List[Dict[str, Any]]:
+        if user_id and user_id not in self.seeded:
+            self.seeded.add(user_id)
+            for _ in range(self.seed_memories.sample() if self.seed_memories.median else 0):
+                self._new_memory(filler(self.memory_bytes.sample()), user_id)
+        return [m for m in self.memories.values() if m.get("user_id") == user_id]
+
+    @staticmethod
+    def _user_filter(filters: Any) -> Optional[str]:
+        if isinstance(filters, dict):
+            if isinstance(filters.get("user_id"), str):
+                return filters["user_id"]
+            for value in filters.values():
+                found = Mem0Stub._user_filter(value)
+                if found:
+                    return found
+        elif isinstance(filters, list):
+            for item in filters:
+                found = Mem0Stub._user_filter(item)
+                if found:
+                    return found
+        return None
+
+    async def _served(self, name: str) -> None:
+        self.requests[name] += 1
+        await self.latency.wait()
+
+    async def ping(self, request: Request):
+        return JSONResponse({"status": "ok", "org_id": "bench-org", "project_id": "bench-project", "user_email": "bench@example.com"})
+
+    async def add(self, request: Request):
+        body = await request.json()
+        await self._served("add")
+        user_id = body.get("user_id")
+        created = [
+            self._new_memory(str(m.get("content", "")), user_id, run_id=body.get("run_id"), agent_id=body.get("agent_id"))
+            for m in body.get("messages", []) if m.get("role") == "user"
+        ]
+        return JSONResponse([{"id": m["id"], "event": "ADD", "data": {"memory": m["memory"]}} for m in created])
+
+    async def get_all(self, request: Request):
+        body = await request.json() if request.method == "POST" else dict(request.query_params)
+        await self._served("get_all")
+        memories = self._for_user(self._user_filter(body.get("filters", body)))
+        page, page_size = body.get("page"), body.get("page_size")
+        if page and page_size:
+            start = (int(page) - 1) * int(page_size)
+            return JSONResponse({"count": len(memories), "results": memories[start:start + int(page_size)]})
+        return JSONResponse(memories)
+
+    async def search(self, request: Request):
+        body = await request.json()
+        await self._served("search")
+        memories = self._for_user(self._user_filter(body.get("filters", {})))
+        top_k = int(body.get("top_k", 10))
+        return JSONResponse([{**m, "score": round(random.random(), 3)} for m in memories[:top_k]])
+
+    async def memory(self, request: Request):
+        memory_id = request.path_params["memory_id"]
+        await self._served(request.method.lower())
+        memory = self.memories.get(memory_id)
+        if memory is None:
+            return JSONResponse({"detail": "Memory not found"}, status_code=404)
+        if request.method == "DELETE":
+            del self.memories[memory_id]
+            return JSONResponse({"message": "Memory deleted successfully!"})
+        if request.method == "PUT":
+            body = await request.json()
+            if body.get("text") is not None:
+                memory["memory"] = body["text"]
+            if body.get("metadata") is not None:
+                memory["metadata"] = body["metadata"]
+            memory["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return JSONResponse(memory)
+
+    async def history(self, request: Request):
+        memory_id = request.path_params["memory_id"]
+        await self._served("history")
+        memory = self.memories.get(memory_id)
+        if memory is None:
+            return JSONResponse([])
+        return JSONResponse([{
+            "id": str(uuid.uuid4()), "memory_id": memory_id, "old_memory": None,
+            "new_memory": memory["memory"], "event": "ADD", "created_at": memory["created_at"],
+        }])
+
+
+# Combined App
+def build_fake_app(groq: ChatCompletionsStub, tavily: TavilyStub, mem0: Mem0Stub) -> Starlette:
+    """
+    One Starlette app serving all three stand-ins; their paths do not overlap, so
+    GROQ_BASE_URL, TAVILY_BASE_URL and MEM0_HOST can all point at the same origin.
+    """
+    return Starlette(routes=[
+        Route("/openai/v1/chat/completions", groq.handle, methods=["POST"]),
+        Route("/search", tavily.handle, methods=["POST"]),
+        Route("/v1/ping/", mem0.ping, methods=["GET"]),
+        Route("/v1/memories/", mem0.add, methods=["POST"]),
+        Route("/v1/memories/", mem0.get_all, methods=["GET"]),
+        Route("/v2/memories/", mem0.get_all, methods=["POST"]),
+        Route("/v2/memories/search/", mem0.search, methods=["POST"]),
+        Route("/v1/memories/search/", mem0.search, methods=["POST"]),
+        Route("/v1/memories/{memory_id}/history/", mem0.history, methods=["GET"]),
+        Route("/v1/memories/{memory_id}/", mem0.memory, methods=["GET", "PUT", "DELETE"]),
+    ])
@@ -0,0 +1,259 @@
+# Import necessary libraries and modules
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import uuid
+import socket
+import random
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+
+from benchmarks.fakes import (
+    LatencyModel, SizeModel, ChatCompletionsStub, TavilyStub, Mem0Stub, build_fake_app
+)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+# Helpers
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def process_rss_mb(pid: int) -> Optional[float]:
+    """Current resident set size of `pid` (Linux /proc only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        return None
+    return None
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return round(peak / (1024.0 * 1024.0 if platform.system() == "Darwin" else 1024.0), 1)
+
+async def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError(f"Nothing is listening on port {port} after {timeout}s")
+
+
+# Benchmark
+def bench_env(fake_url: str, mcp_port: int, mcp_url: str, workers: int = 1, state_dir: str = "") -> Dict[str, str]:
+    """Environment for both the server subprocess and this process' client imports."""
+    return {
+        "SERVER_WORKERS": str(workers),
+        "STATE_STORE": f"sqlite:///{os.path.join(state_dir, 'state.db')}" if workers > 1 else "memory",
+        "GROQ_API_KEY": "bench", "MODEL_NAME": "bench-model",
+        "TAVILY_API_KEY": "bench", "MEM0_API_KEY": "bench",
+        "MEM0_ORG_ID": "bench-org", "MEM0_PROJECT_ID": "bench-project",
+        "GROQ_BASE_URL": fake_url, "TAVILY_BASE_URL": fake_url, "MEM0_HOST": fake_url,
+        "MCP_SERVER_URL": mcp_url,
+        "SERVER_PORT": str(mcp_port), "SERVER_LOG_LEVEL": "WARNING",
+        "MEM0_TELEMETRY": "False",
+    }
+
+async def run_level(
+    sessions: int,
+    turns: int,
+    query_pool: int,
+    mcp_url: str,
+    groq_client: Any,
+    groq_tools: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    from fastmcp import Client
+    from fastmcp.client.transports import StreamableHttpTransport
+    from src.client import AgentSession, build_system_prompt, run_agent_turn
+    from src.history import ConversationHistory
+
+    latencies: List[float] = []
+    failures = 0
+
+    async def one_session(index: int) -> None:
+        nonlocal failures
+        try:
+            async with Client(transport=StreamableHttpTransport(mcp_url)) as mcp_client:
+                session = AgentSession(ConversationHistory(build_system_prompt()), str(uuid.uuid4()), output=lambda event, text="": None)
+                for _ in range(turns):
+                    query = f"I am bench-{index % 50}. Tell me about topic {random.randrange(query_pool)}."
+                    started = time.perf_counter()
+                    reply = await run_agent_turn(query, mcp_client, groq_client, session, groq_tools)
+                    latencies.append(time.perf_counter() - started)
+                    if reply.startswith("Sorry"):
+                        failures += 1
+                await session.drain()
+        except Exception:
+            failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_session(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    return {"elapsed_s": elapsed, "latencies": latencies, "failures": failures}
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    groq_stub = ChatCompletionsStub(
+        LatencyModel(args.groq_ms, args.sigma), SizeModel(args.answer_tokens, args.sigma),
+        token_interval_ms=args.token_interval_ms, tool_plan=[args.tool_plan.split(",")] if args.tool_plan else []
+    )
+    tavily_stub = TavilyStub(LatencyModel(args.tavily_ms, args.sigma), SizeModel(args.search_results, 0.2), SizeModel(args.result_bytes, args.sigma))
+    mem0_stub = Mem0Stub(LatencyModel(args.mem0_ms, args.sigma), SizeModel(args.seed_memories, 0.2, minimum=0), SizeModel(args.memory_bytes, args.sigma))
+
+    # Local stand-ins for Groq, Tavily and mem0 (same process)
+    fake_port = free_port()
+    fake_server = uvicorn.Server(uvicorn.Config(
+        build_fake_app(groq_stub, tavily_stub, mem0_stub), host="127.0.0.1", port=fake_port,
+        log_level="warning", backlog=4096
+    ))
+    fake_task = asyncio.create_task(fake_server.serve())
+    await wait_for_port(fake_port)
+    fake_url = f"http://127.0.0.1:{fake_port}"
+
+    # The real MCP tool server over streamable HTTP (separate process)
+    mcp_port = free_port()
+    mcp_url = f"http://127.0.0.1:{mcp_port}/mcp/"
+    state_dir = tempfile.mkdtemp(prefix="memoria-bench-")
+    env = bench_env(fake_url, mcp_port, mcp_url, args.workers, state_dir)
+    os.environ.update(env)
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT_DIR, "src", "server.py")],
+        env={**os.environ, **env}, cwd=ROOT_DIR,
+        stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL
+    )
+
+    results: Dict[str, Any] = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "verbose")},
+        "python": platform.python_version(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "levels": [],
+    }
+    try:
+        await wait_for_port(mcp_port)
+
+        # Client imports read the environment above
+        from loguru import logger
+        from fastmcp import Client
+        from fastmcp.client.transports import StreamableHttpTransport
+        from groq import AsyncGroq
+        from src.client import to_groq_tools
+        logger.remove()
+        logger.add(sys.stderr, level="DEBUG" if args.verbose else "ERROR")
+
+        async with Client(transport=StreamableHttpTransport(mcp_url)) as probe:
+            groq_tools = to_groq_tools(await probe.list_tools())
+        groq_client = AsyncGroq(api_key="bench", base_url=fake_url, max_retries=0)
+
+        for sessions in args.sessions:
+            before_tool_calls = groq_stub.tool_calls_issued
+            before_upstream = {"tavily": tavily_stub.requests, **dict(mem0_stub.requests)}
+
+            level = await run_level(sessions, args.turns, args.query_pool, mcp_url, groq_client, groq_tools)
+
+            latencies_ms = [latency * 1000.0 for latency in level["latencies"]]
+            tool_calls = groq_stub.tool_calls_issued - before_tool_calls
+            upstream = {"tavily": tavily_stub.requests, **dict(mem0_stub.requests)}
+            summary = {
+                "sessions": sessions,
+                "turns": len(latencies_ms),
+                "failures": level["failures"],
+                "elapsed_s": round(level["elapsed_s"], 3),
+                "turn_latency_ms": {
+                    "p50": percentile(latencies_ms, 50),
+                    "p95": percentile(latencies_ms, 95),
+                    "p99": percentile(latencies_ms, 99),
+                    "mean": sum(latencies_ms) / len(latencies_ms) if latencies_ms else None,
+                    "max": max(latencies_ms) if latencies_ms else None,
+                },
+                "turns_per_s": round(len(latencies_ms) / level["elapsed_s"], 2),
+                "tool_calls": tool_calls,
+                "tool_calls_per_s": round(tool_calls / level["elapsed_s"], 2),
+                "upstream_requests": {k: v - before_upstream.get(k, 0) for k, v in upstream.items()},
+                "server_rss_mb": process_rss_mb(server.pid),
+                "harness_peak_rss_mb": peak_rss_mb(),
+            }
+            for key, value in summary["turn_latency_ms"].items():
+                if value is not None:
+                    summary["turn_latency_ms"][key] = round(value, 2)
+            results["levels"].append(summary)
+            print(
+                f"sessions={sessions:<4} turns={summary['turns']:<5} failures={summary['failures']:<3} "
+                f"p50={summary['turn_latency_ms']['p50']}ms p95={summary['turn_latency_ms']['p95']}ms "
+                f"p99={summary['turn_latency_ms']['p99']}ms tools/s={summary['tool_calls_per_s']} "
+                f"server_rss={summary['server_rss_mb']}MB",
+                file=sys.stderr
+            )
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        fake_server.should_exit = True
+        await fake_task
+
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline Memoria benchmark against local Groq/Tavily/mem0 stand-ins.")
+    parser.add_argument("--sessions", type=lambda v: [int(x) for x in v.split(",")], default=[1, 10, 50, 100, 200],
+                        help="Comma-separated concurrent session counts to sweep (default: 1,10,50,100,200).")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per session.")
+    parser.add_argument("--query-pool", type=int, default=50, help="Distinct topics queries are drawn from (controls search cache hits).")
+    parser.add_argument("--tool-plan", default="get_memories,web_search",
+                        help="Comma-separated tools the stub LLM calls in the first step of each turn ('' for none).")
+    parser.add_argument("--groq-ms", type=float, default=300.0, help="Median LLM time to first token.")
+    parser.add_argument("--token-interval-ms", type=float, default=5.0, help="Delay between streamed answer tokens.")
+    parser.add_argument("--answer-tokens", type=int, default=60, help="Median answer length in tokens.")
+    parser.add_argument("--tavily-ms", type=float, default=400.0, help="Median Tavily search latency.")
+    parser.add_argument("--search-results", type=int, default=8, help="Median hits per search.")
+    parser.add_argument("--result-bytes", type=int, default=1500, help="Median content bytes per search hit.")
+    parser.add_argument("--mem0-ms", type=float, default=150.0, help="Median mem0 API latency.")
+    parser.add_argument("--seed-memories", type=int, default=30, help="Median memories pre-seeded per user.")
+    parser.add_argument("--memory-bytes", type=int, default=200, help="Median bytes per memory.")
+    parser.add_argument("--workers", type=int, default=1, help="Tool server worker processes (shared SQLite state store when > 1).")
+    parser.add_argument("--sigma", type=float, default=0.3, help="Log-normal sigma for latencies and sizes.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed.")
+    parser.add_argument("--output", default="-", help="Where to write the JSON results ('-' for stdout).")
+    parser.add_argument("--verbose", action="store_true", help="Show client and server logs.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    random.seed(args.seed)
+    results = asyncio.run(main(args))
+    payload = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(payload)
+    else:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
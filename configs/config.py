@@ -5,6 +5,10 @@ import os
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../"))
 load_dotenv(dotenv_path=os.path.join(ROOT_DIR, ".env"))
 
+def project_path(path):
+    """Resolves a relative path setting against the project root, so it doesn't depend on the working directory."""
+    return os.path.join(ROOT_DIR, path) if path else None
+
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 MODEL_NAME = os.getenv("MODEL_NAME")
@@ -14,24 +18,127 @@ MEM0_ORG_ID     = os.getenv("MEM0_ORG_ID")
 MEM0_PROJECT_ID = os.getenv("MEM0_PROJECT_ID")
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL")
 
+# Optional upstream endpoint overrides (e.g. the local stand-ins in benchmarks/)
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+TAVILY_BASE_URL = os.getenv("TAVILY_BASE_URL") or None
+MEM0_HOST = os.getenv("MEM0_HOST") or None
+
+# Client agent loop tuning
+PARALLEL_TOOL_DISPATCH = os.getenv("PARALLEL_TOOL_DISPATCH", "true").lower() in ("1", "true", "yes")
+MAX_PARALLEL_TOOLS = int(os.getenv("MAX_PARALLEL_TOOLS", "4"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "800"))
+RESULT_MAX_BYTES = int(os.getenv("RESULT_MAX_BYTES", "4000"))
+RESULT_MAX_TOKENS = int(os.getenv("RESULT_MAX_TOKENS", "1000"))
+RESULT_SEARCH_TOP_K = int(os.getenv("RESULT_SEARCH_TOP_K", "5"))
+RESULT_MEMORY_LIMIT = int(os.getenv("RESULT_MEMORY_LIMIT", "20"))
+AUTO_EPISODIC_SAVE = os.getenv("AUTO_EPISODIC_SAVE", "true").lower() in ("1", "true", "yes")
+PREFETCH_MEMORIES = os.getenv("PREFETCH_MEMORIES", "true").lower() in ("1", "true", "yes")
+
+# Client turn budget: wall-clock deadline and tool rounds per turn, per-call timeouts (seconds), and
+# the extra time allowed for the forced best-effort answer once the budget is spent
+TURN_DEADLINE_S = float(os.getenv("TURN_DEADLINE_S", "60"))
+MAX_TOOL_ITERATIONS = int(os.getenv("MAX_TOOL_ITERATIONS", "8"))
+TOOL_TIMEOUT_S = float(os.getenv("TOOL_TIMEOUT_S", "20"))
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "30"))
+FINAL_ANSWER_TIMEOUT_S = float(os.getenv("FINAL_ANSWER_TIMEOUT_S", "15"))
+
+# Client per-turn tracing (JSONL) and slow-turn sampling profiler (off unless a threshold is set)
+TRACE_PATH = project_path(os.getenv("TRACE_PATH"))
+PROFILE_SLOW_TURN_S = float(os.getenv("PROFILE_SLOW_TURN_S")) if os.getenv("PROFILE_SLOW_TURN_S") else None
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+# Client startup: Groq tool schemas persisted between launches, refreshed when the server's tool list changes (empty disables)
+TOOL_SCHEMA_CACHE_PATH = project_path(os.getenv("TOOL_SCHEMA_CACHE_PATH", "data/tool_schemas.json"))
+
+# Tool server upstream concurrency caps (requests in flight per backend)
+TAVILY_MAX_CONCURRENCY = int(os.getenv("TAVILY_MAX_CONCURRENCY", "16"))
+MEM0_MAX_CONCURRENCY = int(os.getenv("MEM0_MAX_CONCURRENCY", "32"))
+
+# Upstream resilience (Tavily, memory backend, Groq): retries of idempotent reads with jittered backoff,
+# per-backend circuit breakers, and optional hedging of tool server reads slower than their recent p95
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
+RETRY_BASE_DELAY_S = float(os.getenv("RETRY_BASE_DELAY_S", "0.2"))
+RETRY_MAX_DELAY_S = float(os.getenv("RETRY_MAX_DELAY_S", "2"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_S = float(os.getenv("BREAKER_RESET_S", "30"))
+HEDGE_READS = os.getenv("HEDGE_READS", "false").lower() in ("1", "true", "yes")
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+# Tool server batch tools (web_search_batch, get_memories_batch, get_memory_batch)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "20"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+# Tool server get_memories paging (default and largest page_size)
+MEMORY_PAGE_SIZE = int(os.getenv("MEMORY_PAGE_SIZE", "20"))
+MEMORY_MAX_PAGE_SIZE = int(os.getenv("MEMORY_MAX_PAGE_SIZE", "100"))
+
+# Tool server memory backend: "mem0" (cloud API) or "local" (in-process vector store persisted under LOCAL_MEMORY_PATH)
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "mem0").lower()
+LOCAL_MEMORY_PATH = project_path(os.getenv("LOCAL_MEMORY_PATH", "data/memories"))
+LOCAL_MEMORY_DIM = int(os.getenv("LOCAL_MEMORY_DIM", "512"))
+
+# Tool server listen address and log level
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_LOG_LEVEL = os.getenv("SERVER_LOG_LEVEL", "INFO").upper()
+
+# Tool server deployment: worker processes (more than one forces stateless MCP sessions) and the
+# store workers share cache invalidations and pending writes through ("memory" or "sqlite:///path/to/state.db"),
+# with its event retention and how often each worker exchanges invalidations with it (seconds)
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+SERVER_STATELESS = os.getenv("SERVER_STATELESS", "false").lower() in ("1", "true", "yes")
+STATE_STORE = os.getenv("STATE_STORE", "memory")
+if STATE_STORE.startswith("sqlite:///"):
+    STATE_STORE = "sqlite:///" + project_path(STATE_STORE[len("sqlite:///"):])
+STATE_STORE_RETENTION = float(os.getenv("STATE_STORE_RETENTION", "600"))
+STATE_POLL_INTERVAL = float(os.getenv("STATE_POLL_INTERVAL", "0.2"))
+
+# Tool server read-through memory cache
+MEMORY_CACHE_SIZE = int(os.getenv("MEMORY_CACHE_SIZE", "1024"))
+MEMORY_CACHE_TTL = float(os.getenv("MEMORY_CACHE_TTL", "60"))
+
+# Tool server web search cache (SEARCH_CACHE_PATH enables persistence across restarts)
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+SEARCH_CACHE_PATH = project_path(os.getenv("SEARCH_CACHE_PATH"))
+
+# Tool server write-behind queue for add_short_memory / add_longterm_memory
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() in ("1", "true", "yes")
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "20"))
+WRITE_FLUSH_INTERVAL = float(os.getenv("WRITE_FLUSH_INTERVAL", "2"))
+WRITE_QUEUE_MAX_PENDING = int(os.getenv("WRITE_QUEUE_MAX_PENDING", "1000"))
+WRITE_MAX_RETRIES = int(os.getenv("WRITE_MAX_RETRIES", "3"))
+# Seconds a flushed write is still reported as pending while mem0 indexes it in the background
+WRITE_SETTLE_TIME = float(os.getenv("WRITE_SETTLE_TIME", "10"))
+
+# Tool server metrics: log a timing span for every tool and upstream call, and the fraction of
+# tool calls whose argument and result sizes are measured (serializing them costs a json.dumps each)
+METRICS_SPANS = os.getenv("METRICS_SPANS", "false").lower() in ("1", "true", "yes")
+METRICS_PAYLOAD_SAMPLE_RATE = float(os.getenv("METRICS_PAYLOAD_SAMPLE_RATE", "0.05"))
+# Seconds between the metrics snapshots each worker publishes to STATE_STORE when SERVER_WORKERS > 1
+METRICS_EXPORT_INTERVAL = float(os.getenv("METRICS_EXPORT_INTERVAL", "5"))
+
+# Headless multi-session agent service (src/service.py)
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8100"))
+SERVICE_MAX_SESSIONS = int(os.getenv("SERVICE_MAX_SESSIONS", "1000"))
+SERVICE_MAX_CONCURRENT_TURNS = int(os.getenv("SERVICE_MAX_CONCURRENT_TURNS", "64"))
+SERVICE_ADMISSION_TIMEOUT = float(os.getenv("SERVICE_ADMISSION_TIMEOUT", "5"))
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+
+
+# Required settings per role; each entry point validates only its own, so e.g. the client starts without Tavily/mem0 keys
+REQUIRED_SETTINGS = {
+    "client":  ("GROQ_API_KEY", "MODEL_NAME", "MCP_SERVER_URL"),
+    "service": ("GROQ_API_KEY", "MODEL_NAME", "MCP_SERVER_URL"),
+    "server":  ("TAVILY_API_KEY",) + (("MEM0_API_KEY", "MEM0_ORG_ID", "MEM0_PROJECT_ID") if MEMORY_BACKEND == "mem0" else ()),
+}
 
-# Print for debugging
-missing_vars = []
-if not GROQ_API_KEY:
-    missing_vars.append("GROQ_API_KEY")
-if not MODEL_NAME:
-    missing_vars.append("MODEL_NAME")
-if not TAVILY_API_KEY:
-    missing_vars.append("TAVILY_API_KEY")
-if not MEM0_API_KEY:
-    missing_vars.append("MEM0_API_KEY")
-if not MEM0_ORG_ID:
-    missing_vars.append("MEM0_ORG_ID")
-if not MEM0_PROJECT_ID:
-    missing_vars.append("MEM0_PROJECT_ID")
-if not MCP_SERVER_URL:
-    missing_vars.append("MCP_SERVER_URL")
-if missing_vars:
-    raise EnvironmentError(f"❌ Missing environment variables: {', '.join(missing_vars)}")
-else:
-    print("✅ Environment variables loaded successfully.")  
\ No newline at end of file
+def validate_config(role: str) -> None:
+    """Raises EnvironmentError listing the settings `role` ("client", "service" or "server") needs but lacks."""
+    missing_vars = [name for name in REQUIRED_SETTINGS[role] if not globals().get(name)]
+    if missing_vars:
+        raise EnvironmentError(f"❌ Missing environment variables for the {role}: {', '.join(missing_vars)}")
+    print(f"✅ Environment variables loaded successfully ({role}).")
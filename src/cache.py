@@ -0,0 +1,236 @@
+# Import necessary libraries and modules
+import os
+import re
+import json
+import time
+import asyncio
+import tempfile
+from collections import OrderedDict
+from loguru import logger
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    In-process cache with per-entry TTL and LRU size eviction.
+
+    Entries can carry tags (e.g. "user:alice", "memory:<id>") so that a write
+    can invalidate every cached read it affects without knowing their keys.
+    Not thread-safe: it is meant to be used from a single event loop.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), ttl: Optional[float] = None) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+        tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drops every entry carrying `tag` and returns how many were removed."""
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            if key in self._entries:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical cache key for a search query: case-folded, punctuation dropped, whitespace collapsed.
+    "+" and "#" are kept because they change the meaning of a term ("C++", "C#" and "C" differ).
+    """
+    return " ".join(re.sub(r"[^\w\s+#]", " ", query.casefold()).split())
+
+
+class SearchCache:
+    """
+    Byte-bounded LRU cache for web search results with a TTL and optional
+    JSON persistence, so results survive a server restart.
+
+    Expiry uses wall-clock time because entries may be reloaded from disk.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 300.0, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        if path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        self._put(key, time.time() + self.ttl, value)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def load(self) -> None:
+        """Restores unexpired entries from `path`, oldest first so LRU order is preserved."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            now = time.time()
+            for key, expires_at, value in entries:
+                if expires_at > now:
+                    self._put(key, expires_at, value)
+            logger.info(f"Loaded {len(self._entries)} search cache entries from {self.path}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable search cache at {self.path}: {e}")
+
+    def save(self) -> None:
+        """Atomically writes the unexpired entries to `path`."""
+        if not self.path:
+            return
+        now = time.time()
+        entries = [[key, expires_at, value] for key, (expires_at, value, _) in self._entries.items() if expires_at > now]
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # A temp file of its own per writer, since every server worker saves the same cache on shutdown
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            try:
+                json.dump(entries, f)
+            except BaseException:
+                f.close()
+                os.unlink(tmp_path)
+                raise
+        os.replace(tmp_path, self.path)
+        logger.info(f"Saved {len(entries)} search cache entries to {self.path}")
+
+    def _put(self, key: str, expires_at: float, value: Any) -> None:
+        size = len(json.dumps(value, default=str).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (expires_at, value, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one upstream call;
+    every caller awaits the shared result (or exception).
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled caller does not cancel the call the others are waiting on
+        return await asyncio.shield(call)
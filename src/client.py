@@ -1,96 +1,595 @@
 # Import necessary libraries and modules
+from __future__ import annotations
+
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import json
 import asyncio
+import hashlib
+import threading
 import traceback
+import time
 import uuid
+from types import SimpleNamespace
 from loguru import logger
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Callable, Optional, Set, Tuple
+
+# The Groq and fastmcp SDKs take over a second to import; chat_loop imports them once the prompt is up
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+    from fastmcp import Client
+
+from configs.config import (
+    GROQ_API_KEY, GROQ_BASE_URL, MODEL_NAME, MCP_SERVER_URL,
+    PARALLEL_TOOL_DISPATCH, MAX_PARALLEL_TOOLS,
+    HISTORY_TOKEN_BUDGET, HISTORY_SUMMARY_MAX_TOKENS,
+    RESULT_MAX_BYTES, RESULT_MAX_TOKENS, RESULT_SEARCH_TOP_K, RESULT_MEMORY_LIMIT,
+    AUTO_EPISODIC_SAVE, TRACE_PATH, PROFILE_SLOW_TURN_S, PROFILE_INTERVAL_MS,
+    PREFETCH_MEMORIES, TURN_DEADLINE_S, MAX_TOOL_ITERATIONS, TOOL_TIMEOUT_S, LLM_TIMEOUT_S,
+    FINAL_ANSWER_TIMEOUT_S, UPSTREAM_RETRIES, RETRY_BASE_DELAY_S, RETRY_MAX_DELAY_S,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_S, TOOL_SCHEMA_CACHE_PATH, validate_config
+)
+from src.history import ConversationHistory
+from src.prefetch import ToolPrefetcher, WRITE_TOOLS, detect_user_id
+from src.resilience import ResiliencePolicy
+from src.shaping import ResultShaper
+from src.tracing import SessionTracer, TurnTrace
+
+
+
+# Compact JSON projections of tool results before they enter the LLM context
+result_shaper = ResultShaper(
+    max_bytes    = RESULT_MAX_BYTES,
+    max_tokens   = RESULT_MAX_TOKENS,
+    search_top_k = RESULT_SEARCH_TOP_K,
+    memory_limit = RESULT_MEMORY_LIMIT
+)
+
+# Retries with jittered backoff and a circuit breaker around opening a Groq completion stream.
+# Only the request is retried: once tokens have been emitted a failed stream is not replayed.
+# The Groq SDK's own retries are turned off (max_retries=0) so the two do not multiply.
+groq_policy = ResiliencePolicy(
+    "groq",
+    retries           = UPSTREAM_RETRIES,
+    base_delay        = RETRY_BASE_DELAY_S,
+    max_delay         = RETRY_MAX_DELAY_S,
+    failure_threshold = BREAKER_FAILURE_THRESHOLD,
+    reset_timeout     = BREAKER_RESET_S
+)
+
+
+# System Prompt
+DEFAULT_USER_ID = "user-anonymous"
+
+def build_system_prompt() -> str:
+    """Memoria's system prompt; the end-of-turn save rule is only needed when the client does not save turns itself."""
+    if AUTO_EPISODIC_SAVE:
+        remember_rule = ""
+        saving_note = "- **Saving Information:** Each turn (the user's query and your answer) is saved to short-term memory automatically after you respond, so do not call `add_short_memory` for that. Use `add_longterm_memory` for critical facts and preferences that should last forever.\n"
+    else:
+        remember_rule = "5.  **Remember (Final Step):** Once you have all the information needed to answer the user, your final action before responding MUST be to call `add_short_memory`. Save the key facts from the conversation, including the user's query and the main points of the answer you found.\n"
+        saving_note = "- **Saving Information:** Use `add_short_memory` for conversational context. Use `add_longterm_memory` for critical facts and preferences that should last forever. You can call both in the same step if needed.\n"
+
+    return (
+        "You are Memoria, a highly intelligent AI assistant with a sophisticated memory system. Your goal is to be helpful and conversational while intelligently managing your memory.\n\n"
+        "## Your Reasoning Process (Follow on EVERY turn):\n"
+        "1.  **Analyze the User's Intent:** What is the user trying to do? Are they asking a question? Providing new information? Asking to change or delete a memory? Just chatting?\n"
+        "2.  **Formulate a Plan:** Based on the intent, create a step-by-step plan. Group actions that do not depend on each other into the same step.\n"
+        "3.  **Select the Tools for the Next Step:** Choose every tool needed for the next step of your plan and call them together in a single response (e.g., `get_memories` and `web_search` at once). If no tool is needed (e.g., you are just chatting), then you can respond directly.\n"
+        "4.  **Execute and Re-evaluate:** After the tools return, analyze the results and decide the next step in your plan. Only wait for a result before calling a tool that needs it as input.\n"
+        f"{remember_rule}\n"
+        "---"
+        "## Tool Usage Guidelines:\n\n"
+        "### User Identification:\n"
+        "- **If the user provides a name** (e.g., 'I am Bob'), use that name as the `user_id` for all memory operations.\n"
+        f"- **If the user does NOT provide a name**, you MUST use the default identifier `{DEFAULT_USER_ID}` as the `user_id`. Do not invent a user_id from the topic of their query.\n\n"
+        "### Memory Management:\n"
+        "- **First Interaction:** If a user introduces themself, your first step should be to call `get_memories` with their `user_id` to see if you know them.\n"
+        f"{saving_note}"
+        "- **Updating/Deleting:** If a user says 'My name is not Bob, it's Robert' or 'Forget my favorite color', use `update_memory` or `delete_memory` with the correct `memory_id`.\n"
+        "- **Recalling Information:** Use `search_memories_v2` for specific questions about the past. Use `get_memories` to get a general overview of a user; it returns one page at a time, so only request `next_page` when you need more, and pass an earlier `as_of` as `updated_since` to see just what changed.\n\n"
+        "### Information Retrieval:\n"
+        "- **Use `web_search` ONLY when you don't know the answer** and the information is likely on the internet. Do not use it if the user is just chatting.\n"
+        "- **Batch lookups:** To run several searches, or to fetch the memories of several users or several memories by ID, make one call to `web_search_batch`, `get_memories_batch` or `get_memory_batch` instead of many single calls.\n\n"
+        "### CRITICAL RULE:\n"
+        "**Call independent tools in parallel.** Issue all tool calls that do not depend on each other in the same response; only call tools sequentially when one needs the result of another.\n\n"
+    )
+
+
+# Tool Schemas
+def to_groq_tools(raw_tools: List[Any]) -> List[Dict[str, Any]]:
+    """Converts MCP tool definitions into the Groq function-calling schema."""
+    groq_tools = []
+    for t in raw_tools:
+        tool_schema = t.model_json_schema(by_alias=True)
+        groq_tools.append({
+            "type": "function",
+            "function": {
+                "name": t.name,
+                "description": t.description,
+                "parameters": tool_schema.get("parameters", {})
+            }
+        })
+    return groq_tools
+
+class ToolSchemaCache:
+    """
+    Groq tool schemas persisted between launches with a fingerprint of the server's
+    tool list. A launch can start its first turn with them before `list_tools` has
+    returned; they are rebuilt and rewritten only when the fingerprint changes.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.fingerprint: Optional[str] = None
+        self.tools: Optional[List[Dict[str, Any]]] = None
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                self.fingerprint, self.tools = cached["fingerprint"], cached["tools"]
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable tool schema cache {path}: {e}")
+
+    @staticmethod
+    def fingerprint_of(raw_tools: List[Any]) -> str:
+        listing = [t.model_dump(mode="json", exclude_none=True) for t in raw_tools]
+        return hashlib.sha256(json.dumps(listing, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def refresh(self, raw_tools: List[Any]) -> List[Dict[str, Any]]:
+        """Schemas for the server's current tool list, rebuilt and saved only if it changed."""
+        fingerprint = self.fingerprint_of(raw_tools)
+        if fingerprint == self.fingerprint and self.tools is not None:
+            return self.tools
+        if self.fingerprint is not None:
+            logger.info("🔧 Server tool list changed; rebuilding cached tool schemas")
+        self.fingerprint, self.tools = fingerprint, to_groq_tools(raw_tools)
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"fingerprint": fingerprint, "tools": self.tools}, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not save tool schema cache {self.path}: {e}")
+        return self.tools
+
+async def refresh_tool_schemas(mcp_client: Client, schema_cache: ToolSchemaCache) -> List[Dict[str, Any]]:
+    try:
+        raw_tools = await mcp_client.list_tools()
+    except Exception as e:
+        if schema_cache.tools is None:
+            raise
+        logger.warning(f"Listing tools failed ({e}); using the cached tool schemas")
+        return schema_cache.tools
+    logger.info(f"🔧 Available tools: {', '.join(tool.name for tool in raw_tools)}")
+    return schema_cache.refresh(raw_tools)
+
+
+# Turn Output
+OutputFn = Callable[..., None]
+
+def console_output(event: str, text: str = "") -> None:
+    """
+    Default turn output: progress lines and streamed answer tokens go to the terminal.
+    Events: status, tool_call, tool_result, answer_start, token, answer_end, answer, error.
+    """
+    if event == "token":
+        print(text, end="", flush=True)
+    elif event == "answer_start":
+        print("\nAssistant: ", end="", flush=True)
+    elif event == "answer_end":
+        print()
+    elif event in ("answer", "error"):
+        print(f"Assistant: {text}")
+    else:
+        print(text)
+
+
+# Session State
+class AgentSession:
+    """Per-conversation state shared across turns: run id, detected user id, history, tracing and background tasks."""
+
+    def __init__(
+        self,
+        history: ConversationHistory,
+        run_id: str,
+        tracer: Optional[SessionTracer] = None,
+        output: OutputFn = console_output
+    ):
+        self.history = history
+        self.run_id = run_id
+        self.user_id = DEFAULT_USER_ID
+        self.output = output
+        self.background_tasks: Set[asyncio.Task] = set()
+        self.prefetcher = ToolPrefetcher()
+        self.prefetched_users: Set[str] = set()
+        self.tracer = tracer or SessionTracer(
+            run_id,
+            path            = TRACE_PATH,
+            slow_turn_s     = PROFILE_SLOW_TURN_S,
+            sample_interval = PROFILE_INTERVAL_MS / 1000.0
+        )
+        self.trace = TurnTrace(run_id, 0)  # Replaced at the start of every turn
+
+    def spawn(self, coro: Any) -> asyncio.Task:
+        """Runs `coro` in the background, holding a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    async def drain(self) -> None:
+        """Waits for outstanding background work (e.g. episodic saves) before shutdown."""
+        if self.background_tasks:
+            await asyncio.gather(*self.background_tasks, return_exceptions=True)
+
+
+class TurnBudget:
+    """Wall-clock deadline and tool-iteration cap for one turn."""
+
+    def __init__(self, deadline_s: float, max_iterations: int):
+        self.deadline = time.monotonic() + deadline_s
+        self.max_iterations = max_iterations
+        self.iterations = 0
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def timeout(self, cap: float) -> float:
+        """A per-call timeout that never runs past the turn deadline."""
+        return min(cap, self.remaining())
+
+    def exhausted(self) -> Optional[str]:
+        """Why the turn must stop calling tools, or None while budget remains."""
+        if self.remaining() <= 0:
+            return "time limit reached"
+        if self.iterations >= self.max_iterations:
+            return f"{self.max_iterations} tool rounds used"
+        return None
 
-from groq import Groq
-from fastmcp import Client
-from fastmcp.client.transports import StreamableHttpTransport
 
-from configs.config import GROQ_API_KEY, MODEL_NAME, MCP_SERVER_URL
+async def save_episode(mcp_client: Client, session: AgentSession, user_input: str, answer: str) -> None:
+    """Writes the finished turn to short-term memory without holding up the answer."""
+    try:
+        await mcp_client.call_tool("add_short_memory", {
+            "messages": [
+                {"role": "user", "content": user_input},
+                {"role": "assistant", "content": answer},
+            ],
+            "user_id": session.user_id,
+            "run_id": session.run_id,
+        })
+        logger.debug(f"Episode saved for user={session.user_id}, run_id={session.run_id}")
+    except Exception as e:
+        logger.error(f"Automatic episodic save failed: {e}")
+
+
+# Memory Prefetch
+def start_memory_prefetch(user_input: str, mcp_client: Client, session: AgentSession) -> None:
+    """
+    Fires `get_memories` for the user this turn is likely about, concurrently with the first
+    LLM call: a user introducing themself, or the session's current user on its first turn.
+    """
+    session.prefetcher.invalidate()
+    if not PREFETCH_MEMORIES:
+        return
+    user_id = detect_user_id(user_input) or (session.user_id if not session.prefetched_users else None)
+    if not user_id or user_id in session.prefetched_users:
+        return
+
+    session.prefetched_users.add(user_id)
+    trace = session.trace
+    tool_args = {"user_id": user_id}
+
+    async def fetch() -> Any:
+        with trace.span("prefetch", tool="get_memories", user_id=user_id):
+            return await mcp_client.call_tool("get_memories", tool_args)
+
+    session.prefetcher.start("get_memories", tool_args, fetch, session.spawn)
+    logger.debug(f"Prefetching memories for user_id={user_id}")
+
+async def call_tool(mcp_client: Client, session: AgentSession, tool_name: str, tool_args: Dict[str, Any]) -> Any:
+    """Calls an MCP tool, answering from this turn's prefetch when the model asks for the same call."""
+    if tool_name in WRITE_TOOLS:
+        session.prefetcher.invalidate()
+    else:
+        result, hit = await session.prefetcher.take(tool_name, tool_args)
+        if hit:
+            logger.debug(f"Tool '{tool_name}' served from prefetch")
+            return result
+    return await mcp_client.call_tool(tool_name, tool_args)
+
+
+# Tool Execution
+async def execute_tool_call(
+    tool_call: Any,
+    mcp_client: Client,
+    session: AgentSession,
+    semaphore: asyncio.Semaphore,
+    budget: Optional[TurnBudget] = None
+) -> Dict[str, Any]:
+    """
+    Executes a single structured tool call and returns its `tool` history message.
+    Errors (including timeouts) are captured in the message content so one failing call never sinks the others.
+    """
+    tool_name = tool_call.function.name
+    trace = session.trace
+    queued_at = time.perf_counter()
+
+    async with semaphore:
+        with trace.span("tool", tool=tool_name, queued_s=round(time.perf_counter() - queued_at, 6)) as span:
+            try:
+                tool_args = json.loads(tool_call.function.arguments or "{}")
+                session.output("tool_call", f"  - Calling tool: {tool_name}({json.dumps(tool_args)})")
+                if tool_args.get("user_id"):
+                    session.user_id = tool_args["user_id"]
+                if tool_name == "add_short_memory":
+                    tool_args['run_id'] = session.run_id
+
+                timeout = budget.timeout(TOOL_TIMEOUT_S) if budget else TOOL_TIMEOUT_S
+                result = await asyncio.wait_for(call_tool(mcp_client, session, tool_name, tool_args), timeout=timeout)
+                with trace.span("shape_result", tool=tool_name):
+                    result_content = result_shaper.shape(tool_name, result)
+                logger.debug(f"Tool '{tool_name}' returned: {result_content}...")
+
+            except asyncio.TimeoutError:
+                span["error"] = "timeout"
+                logger.warning(f"Tool `{tool_name}` timed out after {timeout:.1f}s")
+                result_content = f"Error executing tool: timed out after {timeout:.1f}s"
+            except Exception as e:
+                span["error"] = str(e)
+                logger.error(f"Tool `{tool_name}` error: {e}\n{traceback.format_exc()}")
+                result_content = f"Error executing tool: {e}"
+
+    return tool_message(tool_call, result_content)
+
+def tool_message(tool_call: Any, content: str) -> Dict[str, Any]:
+    return {
+        "role": "tool",
+        "tool_call_id": tool_call.id,
+        "name": tool_call.function.name,
+        "content": content,
+    }
+
+
+# Streaming LLM Completion
+RAW_TOOL_PREFIX = "<function="
+
+class StreamedToolCall:
+    """A structured tool call reassembled incrementally from streamed `tool_calls` deltas."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.id = ""
+        self.function = SimpleNamespace(name="", arguments="")
+        self.dispatched = False
+
+    def is_complete(self) -> bool:
+        """Arguments are a JSON object, so they only parse once the closing brace has arrived."""
+        arguments = self.function.arguments.strip()
+        if not (self.id and self.function.name and arguments.endswith("}")):
+            return False
+        try:
+            json.loads(arguments)
+            return True
+        except json.JSONDecodeError:
+            return False
+
+    def to_message(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": "function",
+            "function": {"name": self.function.name, "arguments": self.function.arguments or "{}"},
+        }
+
+
+async def stream_completion(
+    groq_client: AsyncGroq,
+    history: List[Dict[str, Any]],
+    groq_tools: List[Dict[str, Any]],
+    on_tool_call: Callable[[StreamedToolCall], None],
+    trace: Optional[TurnTrace] = None,
+    output: OutputFn = console_output,
+    tool_choice: str = "auto"
+) -> SimpleNamespace:
+    """
+    Streams one chat completion, emitting assistant text to `output` as tokens arrive.
+    `on_tool_call` fires as soon as each tool call's arguments are complete,
+    so tool dispatch overlaps with the rest of the generation.
+    """
+    started = time.perf_counter()
+    first_token_at = None
+    queue_time = None
+
+    stream = await groq_policy.call(lambda: groq_client.chat.completions.create(
+        model=MODEL_NAME,
+        temperature=0.2,
+        messages=history,
+        tools=groq_tools,
+        tool_choice=tool_choice,
+        parallel_tool_calls=PARALLEL_TOOL_DISPATCH,
+        max_tokens=4096,
+        stream=True,
+    ), "chat", idempotent=True)
+    opened_at = time.perf_counter()
 
+    content_parts: List[str] = []
+    tool_calls: Dict[int, StreamedToolCall] = {}
+    printing = None  # Undecided until we know the content is not a raw tool call string
+
+    def dispatch(call: StreamedToolCall) -> None:
+        if not call.dispatched:
+            call.dispatched = True
+            on_tool_call(call)
+
+    async for chunk in stream:
+        # Groq reports its server-side queue time in the final chunk's x_groq.usage
+        usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+        if usage is not None and getattr(usage, "queue_time", None) is not None:
+            queue_time = usage.queue_time
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if first_token_at is None and (delta.content or delta.tool_calls):
+            first_token_at = time.perf_counter()
+
+        if delta.content:
+            content_parts.append(delta.content)
+            if printing:
+                output("token", delta.content)
+            elif printing is None:
+                text = "".join(content_parts).lstrip()
+                if text.startswith(RAW_TOOL_PREFIX):
+                    printing = False
+                elif not RAW_TOOL_PREFIX.startswith(text):
+                    printing = True
+                    output("answer_start")
+                    output("token", text)
+
+        for tc_delta in delta.tool_calls or []:
+            call = tool_calls.get(tc_delta.index)
+            if call is None:
+                # A new index means every earlier call has received all of its arguments
+                for earlier in tool_calls.values():
+                    dispatch(earlier)
+                call = tool_calls[tc_delta.index] = StreamedToolCall(tc_delta.index)
+            if tc_delta.id:
+                call.id = tc_delta.id
+            if tc_delta.function:
+                call.function.name += tc_delta.function.name or ""
+                call.function.arguments += tc_delta.function.arguments or ""
+            if call.is_complete():
+                dispatch(call)
+
+    for call in tool_calls.values():
+        dispatch(call)
+
+    content = "".join(content_parts)
+    if printing is None and content.strip():
+        printing = True
+        output("answer_start")
+        output("token", content.lstrip())
+    if printing:
+        output("answer_end")
+
+    if trace is not None:
+        trace.record(
+            "llm", started, time.perf_counter() - started,
+            request_s    = round(opened_at - started, 6),
+            ttft_s       = round(first_token_at - started, 6) if first_token_at else None,
+            queue_time_s = queue_time,
+            tool_calls   = len(tool_calls),
+        )
+
+    return SimpleNamespace(
+        content=content or None,
+        tool_calls=[tool_calls[i] for i in sorted(tool_calls)],
+        streamed=bool(printing),
+    )
 
 
 # Core Logic Loop
 async def run_agent_turn(
     user_input: str,
     mcp_client: Client,
-    groq_client: Groq,
-    history: List[Dict[str, Any]],
-    groq_tools: List[Dict[str, Any]],
-    session_run_id: str
+    groq_client: AsyncGroq,
+    session: AgentSession,
+    groq_tools: List[Dict[str, Any]]
 ) -> str: 
     """
     Runs a full agent turn, correctly handling both structured and raw tool calls.
+    The turn is traced (LLM, tool and parsing spans) and recorded by the session's tracer.
     """
-    # Append the user input to the conversation history
-    history.append({"role": "user", "content": user_input})
-    logger.debug(f"User input added to history: {user_input}")
+    session.trace = session.tracer.start_turn()
+    try:
+        return await agent_turn_loop(user_input, mcp_client, groq_client, session, groq_tools)
+    finally:
+        session.tracer.end_turn(session.trace)
+
+
+async def agent_turn_loop(
+    user_input: str,
+    mcp_client: Client,
+    groq_client: AsyncGroq,
+    session: AgentSession,
+    groq_tools: List[Dict[str, Any]]
+) -> str:
+    """
+    The think/act loop of a turn: stream a completion, run its tool calls, repeat until a final answer.
+    """
+    history = session.history
+    trace = session.trace
+    output = session.output
+    tools_used: Set[str] = set()
+
+    # Append the user input to the conversation history (older turns are compacted to fit the budget)
+    history.begin_turn(user_input)
+    logger.debug(f"User input added to history: {user_input} (~{history.token_count} tokens)")
+
+    # Likely memory reads start now and overlap with the first completion
+    start_memory_prefetch(user_input, mcp_client, session)
     
+    # Bound the number of tool calls in flight over the shared MCP client
+    tool_semaphore = asyncio.Semaphore(MAX_PARALLEL_TOOLS if PARALLEL_TOOL_DISPATCH else 1)
+    budget = TurnBudget(TURN_DEADLINE_S, MAX_TOOL_ITERATIONS)
 
     while True:
-        print("\n🤖 Assistant is thinking...")
+        exhausted = budget.exhausted()
+        if exhausted:
+            return await force_final_answer(user_input, mcp_client, groq_client, session, groq_tools, tools_used, exhausted)
+
+        output("status", "\n🤖 Assistant is thinking...")
         
-        # Groq API Call
+        # Groq API Call (streamed); tool calls start executing as soon as their arguments complete
+        tool_tasks: List[Tuple[StreamedToolCall, asyncio.Task]] = []
+
+        def start_tool(tool_call: StreamedToolCall) -> None:
+            tool_tasks.append((tool_call, asyncio.create_task(
+                execute_tool_call(tool_call, mcp_client, session, tool_semaphore, budget)
+            )))
+
         try:
-            resp = groq_client.chat.completions.create(
-                model=MODEL_NAME,
-                temperature=0.2,
-                messages=history,
-                tools=groq_tools,
-                tool_choice="auto",
-                max_tokens=4096,
+            msg = await asyncio.wait_for(
+                stream_completion(groq_client, history, groq_tools, start_tool, trace, output),
+                timeout=budget.timeout(LLM_TIMEOUT_S)
             )
-            msg = resp.choices[0].message
             logger.debug(f"LLM Raw Response: {msg}")
+        except asyncio.TimeoutError:
+            for _, task in tool_tasks:
+                task.cancel()
+            logger.warning(f"Groq API call timed out after {LLM_TIMEOUT_S}s or at the turn deadline")
+            return await force_final_answer(user_input, mcp_client, groq_client, session, groq_tools, tools_used, "model call timed out")
         except Exception as e:
+            for _, task in tool_tasks:
+                task.cancel()
             logger.error(f"Groq API call failed: {e}")
-            return "Sorry, I had a problem communicating with my brain. Please try again."
+            error_text = "Sorry, I had a problem communicating with my brain. Please try again."
+            output("error", error_text)
+            return error_text
 
         # Check for structured tool calls first
         if msg.tool_calls:
-            print(f"🛠️ Assistant wants to use a structured tool.")
-            history.append(msg) 
+            budget.iterations += 1
+            output("status", f"🛠️ Assistant wants to use {len(msg.tool_calls)} structured tool(s).")
+            tools_used.update(tool_call.function.name for tool_call in msg.tool_calls)
+            history.append({
+                "role": "assistant",
+                "content": msg.content,
+                "tool_calls": [tool_call.to_message() for tool_call in msg.tool_calls],
+            })
             
-            tool_call = msg.tool_calls[0]
-            tool_name = tool_call.function.name
-            tool_args = json.loads(tool_call.function.arguments or "{}")
-
-            # Execute the tool
-            try:
-                print(f"  - Calling tool: {tool_name}({json.dumps(tool_args)})")
-                if tool_name == "add_short_memory":
-                    tool_args['run_id'] = session_run_id
-                
-                result = await mcp_client.call_tool(tool_name, tool_args)
-                result_content = str(result)
-                logger.debug(f"Tool '{tool_name}' returned: {result_content}...")
+            # Wait for the concurrent tool calls until the turn deadline; anything still running is cancelled
+            tool_messages = await collect_tool_results(tool_tasks, budget)
 
-                # Append the result back to history
-                history.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "name": tool_name,
-                    "content": result_content,
-                })
-
-            except Exception as e:
-                logger.error(f"Tool `{tool_name}` error: {e}\n{traceback.format_exc()}")
-                history.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "name": tool_name,
-                    "content": f"Error executing tool: {e}",
-                })
+            # Append the results back to history
+            with trace.span("history", messages=len(tool_messages)):
+                history.extend(tool_messages)
             
-            print("🧠 Assistant is processing the tool result...")
+            output("status", "🧠 Assistant is processing the tool result...")
             continue 
 
 
@@ -101,23 +600,33 @@ async def run_agent_turn(
 
         # If no structured tool_calls, check if the content IS a raw tool call
         elif msg.content and msg.content.strip().startswith("<function="):
-            print(f"⚠️ Assistant returned a raw tool call string. Parsing manually.") # This is a manual print for debugging
+            budget.iterations += 1
+            output("status", f"⚠️ Assistant returned a raw tool call string. Parsing manually.") # This is a manual print for debugging
             
             # Basic parsing for <function=NAME{ARGS}></function>
             try:
                 # This is a simplified parser. It might need to be more robust.
-                func_part = msg.content.split('{', 1)
-                tool_name = func_part[0].replace('<function=', '').strip()
-                args_part = '{' + func_part[1].rsplit('}', 1)[0] + '}'
-                tool_args = json.loads(args_part)
+                with trace.span("raw_tool_parse"):
+                    func_part = msg.content.split('{', 1)
+                    tool_name = func_part[0].replace('<function=', '').strip()
+                    args_part = '{' + func_part[1].rsplit('}', 1)[0] + '}'
+                    tool_args = json.loads(args_part)
 
-                print(f"  - Calling tool: {tool_name}({json.dumps(tool_args)})")
+                output("tool_call", f"  - Calling tool: {tool_name}({json.dumps(tool_args)})")
+                tools_used.add(tool_name)
+                if tool_args.get("user_id"):
+                    session.user_id = tool_args["user_id"]
                 if tool_name == "add_short_memory":
-                    tool_args['run_id'] = session_run_id
+                    tool_args['run_id'] = session.run_id
 
-                result = await mcp_client.call_tool(tool_name, tool_args)
-                result_content = str(result)
-                print(f"  - Tool '{tool_name}' returned: {result_content[:300]}...")
+                with trace.span("tool", tool=tool_name, raw=True):
+                    result = await asyncio.wait_for(
+                        call_tool(mcp_client, session, tool_name, tool_args),
+                        timeout=budget.timeout(TOOL_TIMEOUT_S)
+                    )
+                with trace.span("shape_result", tool=tool_name):
+                    result_content = result_shaper.shape(tool_name, result)
+                output("tool_result", f"  - Tool '{tool_name}' returned: {result_content[:300]}...")
 
                 # Append the result back to history 
                 history.append({
@@ -125,96 +634,208 @@ async def run_agent_turn(
                     "content": f"The tool '{tool_name}' returned this result:\n{result_content}"
                 })
 
+            except asyncio.TimeoutError:
+                logger.warning(f"Raw tool call timed out")
+                history.append({"role": "user", "content": "I tried to call a tool but it timed out."})
             except Exception as e:
                 logger.error(f"Failed to parse or execute raw tool call: {e}")
                 history.append({"role": "user", "content": f"I tried to call a tool but failed: {e}"})
 
-            print("🧠 Assistant is processing the tool result...")
+            output("status", "🧠 Assistant is processing the tool result...")
             continue # Loop to continue the thought process
 
         else:
         
-            print("✅ Assistant has a final answer.")
-            assistant_text = msg.content or "I'm finished with the task."
-            history.append({"role": "assistant", "content": assistant_text})
-            return assistant_text
+            output("status", "✅ Assistant has a final answer.")
+            return finish_turn(msg.content or "I'm finished with the task.", msg.streamed, user_input, mcp_client, session, tools_used)
+
+
+async def collect_tool_results(
+    tool_tasks: List[Tuple[StreamedToolCall, asyncio.Task]],
+    budget: TurnBudget
+) -> List[Dict[str, Any]]:
+    """
+    Waits for a step's tool tasks until the turn deadline and returns their messages in
+    tool_call order. Tasks still running at the deadline are cancelled and answered with
+    a cancellation notice, since every tool_call needs a matching tool message.
+    """
+    tasks = [task for _, task in tool_tasks]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=budget.remaining())
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Cancelled {len(pending)} tool call(s) at the turn deadline")
+
+    messages = []
+    for tool_call, task in sorted(tool_tasks, key=lambda pair: pair[0].index):
+        if task.done() and not task.cancelled():
+            messages.append(task.result())
+        else:
+            messages.append(tool_message(tool_call, "Cancelled: the turn ran out of time before this tool finished."))
+    return messages
+
+
+def finish_turn(
+    assistant_text: str,
+    streamed: bool,
+    user_input: str,
+    mcp_client: Client,
+    session: AgentSession,
+    tools_used: Set[str]
+) -> str:
+    """Records the final answer and saves the episode in the background."""
+    session.history.append({"role": "assistant", "content": assistant_text})
+    if not streamed:
+        session.output("answer", assistant_text)
+
+    # Save the episode in the background unless the model already did it this turn
+    if AUTO_EPISODIC_SAVE and "add_short_memory" not in tools_used:
+        session.spawn(save_episode(mcp_client, session, user_input, assistant_text))
+    return assistant_text
+
+
+async def force_final_answer(
+    user_input: str,
+    mcp_client: Client,
+    groq_client: AsyncGroq,
+    session: AgentSession,
+    groq_tools: List[Dict[str, Any]],
+    tools_used: Set[str],
+    reason: str
+) -> str:
+    """
+    Once the turn budget is spent, asks the model for a best-effort answer with tool calls
+    disabled, bounded by FINAL_ANSWER_TIMEOUT_S. The instruction is not kept in history.
+    """
+    session.output("status", f"⏱️ Turn budget exhausted ({reason}); wrapping up with what I have.")
+    session.trace.record("budget_exhausted", time.perf_counter(), 0.0, reason=reason)
+    instruction = {
+        "role": "system",
+        "content": (
+            f"The time budget for this turn is exhausted ({reason}). Do not call any tools. "
+            "Answer the user now using only the information already gathered, and briefly say what could not be completed."
+        ),
+    }
+    try:
+        msg = await asyncio.wait_for(
+            stream_completion(
+                groq_client, [*session.history, instruction], groq_tools, lambda call: None,
+                session.trace, session.output, tool_choice="none"
+            ),
+            timeout=FINAL_ANSWER_TIMEOUT_S
+        )
+    except Exception as e:
+        logger.error(f"Forced final answer failed: {e!r}")
+        error_text = "Sorry, I ran out of time working on that. Please try again or narrow the request."
+        session.output("error", error_text)
+        return error_text
+
+    content = msg.content if msg.content and not msg.content.strip().startswith(RAW_TOOL_PREFIX) else None
+    return finish_turn(
+        content or "Sorry, I ran out of time before I could finish that.",
+        msg.streamed and content is not None, user_input, mcp_client, session, tools_used
+    )
 
 # Main Application
+def read_line(prompt: str) -> asyncio.Future:
+    """
+    Reads one line of console input on a daemon thread, so the event loop keeps running
+    (background saves, connection setup) while the user types, and exiting never waits on stdin.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(setter: Callable[[Any], None], value: Any) -> None:
+        if not future.done():
+            setter(value)
+
+    def read() -> None:
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            result = (future.set_exception, e)
+        else:
+            result = (future.set_result, line)
+        try:
+            loop.call_soon_threadsafe(deliver, *result)
+        except RuntimeError:  # loop already closed
+            pass
+
+    threading.Thread(target=read, daemon=True).start()
+    return future
+
+async def prewarm_groq(groq_client: AsyncGroq) -> None:
+    """Opens the Groq HTTPS connection with a cheap request, so the first completion skips the handshakes."""
+    try:
+        await groq_client.models.list()
+    except Exception as e:
+        logger.debug(f"Groq pre-warm failed: {e}")
+
 async def chat_loop():
     """Main chat loop that initializes the agent and handles user input."""
     
     
     print("Starting Memoria Agent...")
+    validate_config("client")
+    print("\nAssistant: Hi, I am Agent Memoria! 🤖 Your AI assistant. How can I help you today? 😊")
+
+    # The first prompt is read while the SDKs load and the MCP session, tool schemas and
+    # Groq connection are set up, so startup overlaps with the user typing
+    first_input = read_line("You: ")
+    from groq import AsyncGroq, APIError
+    from fastmcp import Client
+    from fastmcp.client.transports import StreamableHttpTransport
+
+    schema_cache = ToolSchemaCache(TOOL_SCHEMA_CACHE_PATH)
     try:
+        groq_client = AsyncGroq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, max_retries=0)
+        groq_warmup = asyncio.create_task(prewarm_groq(groq_client))
+
         transport = StreamableHttpTransport(MCP_SERVER_URL)
         async with Client(transport=transport) as mcp_client:
-            await mcp_client.ping()
             logger.info(f"✅ Connected to MCP server at {MCP_SERVER_URL}")
 
-            # Prepare tools for the Groq API
-            raw_tools = await mcp_client.list_tools()
-            logger.info(f"🔧 Available tools: {', '.join(tool.name for tool in raw_tools)}")
-            groq_tools = []
-            for t in raw_tools:
-                tool_schema = t.model_json_schema(by_alias=True)
-                groq_tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": t.name,
-                        "description": t.description,
-                        "parameters": tool_schema.get("parameters", {})
-                    }
-                })
+            # Tools for the Groq API: cached schemas serve the first turn if list_tools is still in flight
+            tools_refresh = asyncio.create_task(refresh_tool_schemas(mcp_client, schema_cache))
+            groq_tools = schema_cache.tools
 
-            # System prompt content
-            system_prompt_content = (
-                "You are Memoria, a highly intelligent AI assistant with a sophisticated memory system. Your goal is to be helpful and conversational while intelligently managing your memory.\n\n"
-                "## Your Reasoning Process (Follow on EVERY turn):\n"
-                "1.  **Analyze the User's Intent:** What is the user trying to do? Are they asking a question? Providing new information? Asking to change or delete a memory? Just chatting?\n"
-                "2.  **Formulate a Plan:** Based on the intent, create a step-by-step plan. Your plan should consist of a series of single actions.\n"
-                "3.  **Select ONE Tool for the First Step:** Choose the single best tool to accomplish the first step of your plan. If no tool is needed (e.g., you are just chatting), then you can respond directly.\n"
-                "4.  **Execute and Re-evaluate:** After using a tool, analyze the result and decide the next step in your plan. This may involve using another tool.\n"
-                "5.  **Remember (Final Step):** Once you have all the information needed to answer the user, your final action before responding MUST be to call `add_short_memory`. Save the key facts from the conversation, including the user's query and the main points of the answer you found.\n\n"
-                "---"
-                "## Tool Usage Guidelines:\n\n"
-                "### User Identification:\n"
-                "- **If the user provides a name** (e.g., 'I am Bob'), use that name as the `user_id` for all memory operations.\n"
-                "- **If the user does NOT provide a name**, you MUST use the default identifier `user-anonymous` as the `user_id`. Do not invent a user_id from the topic of their query.\n\n"
-                "### Memory Management:\n"
-                "- **First Interaction:** If a user introduces themself, your first step should be to call `get_memories` with their `user_id` to see if you know them.\n"
-                "- **Saving Information:** Use `add_short_memory` for conversational context. Use `add_longterm_memory` for critical facts and preferences that should last forever. You can call both if needed, but do it in separate steps.\n"
-                "- **Updating/Deleting:** If a user says 'My name is not Bob, it's Robert' or 'Forget my favorite color', use `update_memory` or `delete_memory` with the correct `memory_id`.\n"
-                "- **Recalling Information:** Use `search_memories_v2` for specific questions about the past. Use `get_memories` to get a general overview of a user.\n\n"
-                "### Information Retrieval:\n"
-                "- **Use `web_search` ONLY when you don't know the answer** and the information is likely on the internet. Do not use it if the user is just chatting.\n\n"
-                "### CRITICAL RULE:\n"
-                "**You MUST call only one tool at a time.** This is a strict limitation. Your plan must be executed sequentially, step by step.\n\n"
-            )
-            history = [{"role": "system", "content": system_prompt_content}]
-            
-            # Initialize Groq client and session ID
-            groq_client = Groq(api_key=GROQ_API_KEY)
             session_run_id = str(uuid.uuid4())
             logger.info(f"🤖 Memoria session started. Session ID: {session_run_id}")
 
-            print("\nAssistant: Hi, I am Agent Memoria! 🤖 Your AI assistant. How can I help you today? 😊")
-        
+            history = ConversationHistory(
+                build_system_prompt(),
+                token_budget       = HISTORY_TOKEN_BUDGET,
+                summary_max_tokens = HISTORY_SUMMARY_MAX_TOKENS,
+                memory_hint        = f"Details of these turns were saved to memory with run_id={session_run_id}; use `search_memories_v2` to recall them."
+            )
+            session = AgentSession(history, session_run_id)
+
             # Chat loop
             while True:
-                user_input = input("You: ").strip()
+                # Read input off the event loop so background saves keep running while the user types
+                pending_input, first_input = first_input or read_line("You: "), None
+                user_input = (await pending_input).strip()
                 if not user_input:
                     continue
                 if user_input.lower() in ("exit", "quit"):
                     print("👋 Goodbye!")
                     break
 
-                # Memoria's turn to think and respond
-                final_reply = await run_agent_turn(
-                    user_input, mcp_client, groq_client, history, groq_tools, session_run_id
-                )
-                print(f"Assistant: {final_reply}")
+                if groq_tools is None or tools_refresh.done():
+                    groq_tools = await tools_refresh
+
+                # Memoria's turn to think and respond (the reply is streamed to the console)
+                await run_agent_turn(user_input, mcp_client, groq_client, session, groq_tools)
+
+            groq_warmup.cancel()
+            tools_refresh.cancel()
+
+            # Let in-flight episodic saves finish before the MCP connection closes
+            await session.drain()
+            session.tracer.close()
 
-    except Groq.APIError as e:
+    except APIError as e:
         logger.error(f"❌ Groq API error: {e}")
         print("Sorry, I had a problem communicating with my brain. Please try again later.")
     except Exception as e:
@@ -0,0 +1,140 @@
+# Import necessary libraries and modules
+from loguru import logger
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def estimate_tokens(message: Any) -> int:
+    """Cheap token estimate (~4 characters per token plus per-message overhead)."""
+    chars = len(str(_field(message, "content") or ""))
+    for tool_call in _field(message, "tool_calls") or []:
+        function = _field(tool_call, "function") or {}
+        chars += len(str(_field(function, "name") or "")) + len(str(_field(function, "arguments") or ""))
+    return chars // 4 + 4
+
+
+def _field(obj: Any, name: str) -> Any:
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class ConversationHistory(list):
+    """
+    Message list for the chat completions API that keeps its prompt size flat.
+
+    An estimated token count is maintained incrementally as messages are
+    appended. When it exceeds `token_budget`, the oldest completed turns are
+    compacted into one-line entries of a rolling summary message until the
+    count drops below `compact_to` of the budget. The system prompt and the
+    current turn (with all of its tool-call/result pairs) are never touched.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        token_budget: int = 6000,
+        summary_max_tokens: int = 800,
+        compact_to: float = 0.75,
+        memory_hint: Optional[str] = None
+    ):
+        super().__init__()
+        self.token_budget = token_budget
+        self.summary_max_tokens = summary_max_tokens
+        self.compact_to = compact_to
+        self.memory_hint = memory_hint
+        self.token_count = 0
+        self.compacted_turns = 0
+        self._tokens: List[int] = []
+        self._turn_starts: List[int] = []
+        self._summary_lines: List[str] = []
+        self._has_summary = False
+        self.append({"role": "system", "content": system_prompt})
+
+    def append(self, message: Any) -> None:
+        super().append(message)
+        tokens = estimate_tokens(message)
+        self._tokens.append(tokens)
+        self.token_count += tokens
+        if self.token_count > self.token_budget:
+            self.compact()
+
+    def extend(self, messages: Iterable[Any]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def begin_turn(self, user_input: str) -> None:
+        """Appends the user's message and marks it as the start of a new turn."""
+        self._turn_starts.append(len(self))
+        self.append({"role": "user", "content": user_input})
+
+    def compact(self) -> None:
+        """Summarizes the oldest completed turns until the history fits the budget again."""
+        target = int(self.token_budget * self.compact_to)
+        while self.token_count > target and len(self._turn_starts) > 1:
+            self._compact_oldest_turn()
+        if self.token_count > self.token_budget:
+            logger.debug(f"History still at ~{self.token_count} tokens after compaction; the current turn is kept intact.")
+
+    def _compact_oldest_turn(self) -> None:
+        start, end = self._turn_starts[0], self._turn_starts[1]
+        line = self._summarize_turn(self[start:end])
+
+        removed_tokens = sum(self._tokens[start:end])
+        del self[start:end]
+        del self._tokens[start:end]
+        self.token_count -= removed_tokens
+        self._turn_starts = [index - (end - start) for index in self._turn_starts[1:]]
+        self.compacted_turns += 1
+
+        self._summary_lines.append(line)
+        self._write_summary()
+
+    def _summarize_turn(self, messages: List[Any]) -> str:
+        user_text = _field(messages[0], "content") or ""
+        answer = ""
+        tools: List[str] = []
+        for message in messages[1:]:
+            for tool_call in _field(message, "tool_calls") or []:
+                tools.append(_field(_field(tool_call, "function") or {}, "name") or "?")
+            if _field(message, "role") == "assistant" and not _field(message, "tool_calls"):
+                answer = _field(message, "content") or answer
+
+        line = f"- User: {_clip(user_text, 200)}"
+        if tools:
+            line += f" | Tools: {', '.join(dict.fromkeys(tools))}"
+        if answer:
+            line += f" | Assistant: {_clip(answer, 300)}"
+        return line
+
+    def _write_summary(self) -> None:
+        # Keep the summary itself bounded; the oldest lines remain recoverable from memory
+        while len(self._summary_lines) > 1 and sum(len(line) for line in self._summary_lines) // 4 > self.summary_max_tokens:
+            self._summary_lines.pop(0)
+
+        header = f"Summary of {self.compacted_turns} earlier turn(s) of this conversation, compacted to save context."
+        if self.memory_hint:
+            header += f" {self.memory_hint}"
+        summary = {"role": "system", "content": header + "\n" + "\n".join(self._summary_lines)}
+
+        tokens = estimate_tokens(summary)
+        if self._has_summary:
+            self.token_count += tokens - self._tokens[1]
+            self[1] = summary
+            self._tokens[1] = tokens
+        else:
+            super().insert(1, summary)
+            self._tokens.insert(1, tokens)
+            self.token_count += tokens
+            self._turn_starts = [index + 1 for index in self._turn_starts]
+            self._has_summary = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "messages": len(self),
+            "tokens": self.token_count,
+            "budget": self.token_budget,
+            "compacted_turns": self.compacted_turns,
+        }
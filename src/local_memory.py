@@ -0,0 +1,340 @@
+# Import necessary libraries and modules
+import os
+import re
+import json
+import uuid
+import zlib
+import hashlib
+from datetime import datetime, timezone
+from loguru import logger
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from src.memory_backends import MemoryBackend, INDEXED_FIELDS, filter_clauses, match_filter
+
+
+# Embeddings
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def hash_embed(texts: Iterable[str], dim: int) -> np.ndarray:
+    """
+    Feature-hashed bag of words and word bigrams, L2-normalized. Needs no model
+    and embeds in microseconds; pass `embed_fn` to LocalVectorBackend for a
+    learned embedding instead.
+    """
+    texts = list(texts)
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, text in enumerate(texts):
+        tokens = TOKEN_RE.findall(text.lower())
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            h = zlib.crc32(feature.encode("utf-8"))
+            matrix[i, h % dim] += 1.0 if h & 0x80000000 else -1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# Local Vector Backend
+class LocalVectorBackend(MemoryBackend):
+    """
+    In-process memory store. Embeddings live in one float32 matrix, memory-mapped
+    from `<path>/vectors.f32`; records and their edit history are rebuilt at start
+    from the append-only `<path>/journal.jsonl`. A per-field index on
+    user_id/agent_id/run_id narrows the candidate rows before the remaining
+    filter is evaluated, and all queries of a search are scored with one matmul.
+    Without `path` everything is kept in memory only.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        dim: int = 512,
+        embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None
+    ):
+        self.path = path
+        self.dim = dim
+        self.embed = embed_fn or (lambda texts: hash_embed(texts, dim))
+        self._capacity = 0
+        self._size = 0
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._records: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {}
+        self._history: Dict[str, List[Dict[str, Any]]] = {}
+        self._index: Dict[str, Dict[str, Set[int]]] = {field: {} for field in INDEXED_FIELDS}
+        self._hashes: Dict[tuple, str] = {}  # (user_id, agent_id, run_id, text hash) -> memory id
+        self._journal = None
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+            self._journal = open(os.path.join(path, "journal.jsonl"), "a", encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # Storage
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    def _ensure_capacity(self, rows: int) -> None:
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, self._capacity * 2, 1024)
+        if self.path:
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            vectors_path = self._vectors_path()
+            if not os.path.exists(vectors_path):
+                open(vectors_path, "wb").close()
+            os.truncate(vectors_path, capacity * self.dim * 4)
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        else:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+        self._capacity = capacity
+
+    def _load(self) -> None:
+        vectors_path = self._vectors_path()
+        if os.path.exists(vectors_path):
+            rows = os.path.getsize(vectors_path) // (self.dim * 4)
+            if rows:
+                self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+                self._alive = np.zeros(rows, dtype=bool)
+                self._capacity = rows
+
+        journal_path = os.path.join(self.path, "journal.jsonl")
+        if not os.path.exists(journal_path):
+            return
+        with open(journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError, IndexError) as e:
+                    logger.warning(f"Skipping unreadable memory journal entry: {e}")
+        logger.info(f"Loaded {len(self)} local memories from {self.path}")
+
+    def _log(self, event: Dict[str, Any]) -> None:
+        self._apply(event)
+        if self._journal:
+            self._journal.write(json.dumps(event, default=str) + "\n")
+            self._journal.flush()
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        """Applies one journal event to the in-memory records, index and history."""
+        row, record = event["row"], event.get("record")
+        if event["op"] == "add":
+            self._ensure_capacity(row + 1)
+            while len(self._records) <= row:
+                self._records.append(None)
+            self._size = max(self._size, row + 1)
+            self._records[row] = record
+            self._rows[record["id"]] = row
+            self._alive[row] = True
+            for field in INDEXED_FIELDS:
+                if record.get(field):
+                    self._index[field].setdefault(record[field], set()).add(row)
+            self._hashes[self._dedup_key(record)] = record["id"]
+            self._record_history(record["id"], None, record["memory"], "ADD", record["created_at"])
+        elif event["op"] == "update":
+            previous = self._records[row]
+            self._records[row] = record
+            self._hashes.pop(self._dedup_key(previous), None)
+            self._hashes[self._dedup_key(record)] = record["id"]
+            self._record_history(record["id"], previous["memory"], record["memory"], "UPDATE", record["updated_at"])
+        elif event["op"] == "delete":
+            previous = self._records[row]
+            self._records[row] = None
+            self._alive[row] = False
+            self._rows.pop(previous["id"], None)
+            for field in INDEXED_FIELDS:
+                if previous.get(field):
+                    self._index[field].get(previous[field], set()).discard(row)
+            self._hashes.pop(self._dedup_key(previous), None)
+            self._record_history(previous["id"], previous["memory"], None, "DELETE", event["at"])
+
+    @staticmethod
+    def _dedup_key(record: Dict[str, Any]) -> tuple:
+        return (record.get("user_id"), record.get("agent_id"), record.get("run_id"), record["hash"])
+
+    def _record_history(self, memory_id: str, old: Optional[str], new: Optional[str], action: str, at: str) -> None:
+        self._history.setdefault(memory_id, []).append({
+            "id": str(uuid.uuid4()),
+            "memory_id": memory_id,
+            "old_memory": old,
+            "new_memory": new,
+            "event": action,
+            "created_at": at,
+        })
+
+    # Filtering
+    def _candidates(self, filters: Any) -> Optional[Set[int]]:
+        """Rows a filter can match according to the id index; None means every row."""
+        if not isinstance(filters, dict):
+            return None
+        narrowed: List[Set[int]] = []
+        for key, condition in filters.items():
+            if key in INDEXED_FIELDS:
+                if isinstance(condition, str) and condition != "*":
+                    narrowed.append(self._index[key].get(condition, set()))
+                elif isinstance(condition, dict) and set(condition) == {"in"} and isinstance(condition["in"], list):
+                    narrowed.append(set().union(*(self._index[key].get(v, set()) for v in condition["in"])))
+            elif key == "AND":
+                narrowed.extend(c for c in map(self._candidates, filter_clauses(condition)) if c is not None)
+            elif key == "OR":
+                options = [self._candidates(clause) for clause in filter_clauses(condition)]
+                if options and all(option is not None for option in options):
+                    narrowed.append(set().union(*options))
+        if not narrowed:
+            return None
+        narrowed.sort(key=len)
+        return narrowed[0].intersection(*narrowed[1:])
+
+    @staticmethod
+    def _index_only(filters: Any) -> bool:
+        """True if the index alone decides the filter, so records need not be checked."""
+        return isinstance(filters, dict) and all(
+            key in INDEXED_FIELDS and isinstance(condition, str) and condition != "*"
+            for key, condition in filters.items()
+        )
+
+    def _matching_rows(self, filters: Any) -> np.ndarray:
+        candidates = self._candidates(filters)
+        if candidates is None:
+            rows = np.flatnonzero(self._alive[:self._size])
+        else:
+            rows = np.fromiter(sorted(candidates), dtype=np.int64, count=len(candidates))
+        if filters and not self._index_only(filters) and len(rows):
+            keep = np.fromiter((match_filter(self._records[r], filters) for r in rows), dtype=bool, count=len(rows))
+            rows = rows[keep]
+        return rows
+
+    # Memory API
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    async def add(
+        self,
+        messages: List[Dict[str, str]],
+        user_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        run_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Stores each user/assistant message as one memory; exact duplicates in the same scope are skipped."""
+        events = []
+        texts, records = [], []
+        batch: Dict[tuple, str] = {}
+        for message in messages:
+            text = str(message.get("content") or "").strip()
+            if not text or message.get("role") not in ("user", "assistant"):
+                continue
+            digest = hashlib.md5(text.encode("utf-8")).hexdigest()
+            key = (user_id, agent_id, run_id, digest)
+            duplicate = self._hashes.get(key) or batch.get(key)
+            if duplicate:
+                events.append({"id": duplicate, "event": "NONE", "data": {"memory": text}})
+                continue
+            now = self._now()
+            batch[key] = memory_id = str(uuid.uuid4())
+            texts.append(text)
+            records.append({
+                "id": memory_id,
+                "memory": text,
+                "hash": digest,
+                "user_id": user_id,
+                "agent_id": agent_id,
+                "run_id": run_id,
+                "metadata": {**(metadata or {}), "role": message["role"]},
+                "categories": [],
+                "created_at": now,
+                "updated_at": now,
+            })
+
+        if records:
+            vectors = self.embed(texts)
+            self._ensure_capacity(self._size + len(records))
+            for record, vector in zip(records, vectors):
+                row = self._size
+                self._vectors[row] = vector
+                self._log({"op": "add", "row": row, "record": record})
+                events.append({"id": record["id"], "event": "ADD", "data": {"memory": record["memory"]}})
+        return {"results": events}
+
+    def search_batch(
+        self,
+        queries: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        top_k: int = 10,
+        threshold: Optional[float] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Scores every query against the filtered rows in one matrix product."""
+        rows = self._matching_rows(filters)
+        if not queries or not len(rows):
+            return [[] for _ in queries]
+        scores = self.embed(queries) @ self._vectors[rows].T
+        k = min(top_k, len(rows))
+        results = []
+        for row_scores in scores:
+            top = np.argpartition(-row_scores, k - 1)[:k]
+            top = top[np.argsort(-row_scores[top])]
+            results.append([
+                {**self._records[rows[j]], "score": round(float(row_scores[j]), 4)}
+                for j in top if threshold is None or row_scores[j] >= threshold
+            ])
+        return results
+
+    async def search(self, query: str, filters: Optional[Dict[str, Any]] = None, top_k: int = 10, threshold: Optional[float] = None, **kwargs) -> List[Dict[str, Any]]:
+        return self.search_batch([query], filters, top_k, threshold)[0]
+
+    async def get_all(self, filters: Optional[Dict[str, Any]] = None, page: Optional[int] = None, page_size: Optional[int] = None, **kwargs) -> Any:
+        rows = self._matching_rows(filters)
+        if page and page_size:
+            # Only the requested page's records are materialized
+            start = (int(page) - 1) * int(page_size)
+            return {"count": len(rows), "results": [self._records[r] for r in rows[start:start + int(page_size)]]}
+        return [self._records[r] for r in rows]
+
+    def _row(self, memory_id: str) -> int:
+        row = self._rows.get(memory_id)
+        if row is None:
+            raise KeyError(f"Memory {memory_id} not found")
+        return row
+
+    async def get(self, memory_id: str) -> Dict[str, Any]:
+        return self._records[self._row(memory_id)]
+
+    async def update(self, memory_id: str, text: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        row = self._row(memory_id)
+        record = dict(self._records[row])
+        if text is not None:
+            record["memory"] = text
+            record["hash"] = hashlib.md5(text.encode("utf-8")).hexdigest()
+            self._vectors[row] = self.embed([text])[0]
+        if metadata is not None:
+            record["metadata"] = {**(record.get("metadata") or {}), **metadata}
+        record["updated_at"] = self._now()
+        self._log({"op": "update", "row": row, "record": record})
+        return record
+
+    async def delete(self, memory_id: str) -> Dict[str, str]:
+        self._log({"op": "delete", "row": self._row(memory_id), "at": self._now()})
+        return {"message": "Memory deleted successfully!"}
+
+    async def history(self, memory_id: str) -> List[Dict[str, Any]]:
+        return list(self._history.get(memory_id, []))
+
+    async def close(self) -> None:
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
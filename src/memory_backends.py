@@ -0,0 +1,149 @@
+# Import necessary libraries and modules
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+
+# Backend Interface
+class MemoryBackend(ABC):
+    """
+    Storage behind the memory tools. Method names and keyword arguments follow
+    mem0's AsyncMemoryClient so the tools are backend-agnostic; `name` labels
+    the backend in upstream metrics.
+    """
+
+    name = "memory"
+
+    @abstractmethod
+    async def add(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        ...
+
+    @abstractmethod
+    async def search(self, query: str, **kwargs) -> Any:
+        ...
+
+    @abstractmethod
+    async def get_all(self, **kwargs) -> Any:
+        ...
+
+    @abstractmethod
+    async def get(self, memory_id: str) -> Any:
+        ...
+
+    @abstractmethod
+    async def update(self, memory_id: str, text: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Any:
+        ...
+
+    @abstractmethod
+    async def delete(self, memory_id: str) -> Any:
+        ...
+
+    @abstractmethod
+    async def history(self, memory_id: str) -> Any:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class Mem0Backend(MemoryBackend):
+    """The mem0 platform API through a shared AsyncMemoryClient."""
+
+    name = "mem0"
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def add(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        return await self.client.add(messages, **kwargs)
+
+    async def search(self, query: str, **kwargs) -> Any:
+        return await self.client.search(query, **kwargs)
+
+    async def get_all(self, **kwargs) -> Any:
+        return await self.client.get_all(**kwargs)
+
+    async def get(self, memory_id: str) -> Any:
+        return await self.client.get(memory_id=memory_id)
+
+    async def update(self, memory_id: str, text: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Any:
+        return await self.client.update(memory_id=memory_id, text=text, metadata=metadata)
+
+    async def delete(self, memory_id: str) -> Any:
+        return await self.client.delete(memory_id=memory_id)
+
+    async def history(self, memory_id: str) -> Any:
+        return await self.client.history(memory_id=memory_id)
+
+    async def close(self) -> None:
+        # AsyncMemoryClient has no close(); leaving its `async with` block closes this same pool
+        await self.client.async_client.aclose()
+
+
+# Filters
+# Same grammar as mem0 v2 filters: AND / OR / NOT over field conditions, where a
+# condition is a literal, "*" or a dict of comparison operators.
+INDEXED_FIELDS = ("user_id", "agent_id", "run_id")
+
+def _compare(op: str, value: Any, operand: Any) -> bool:
+    if value is None:
+        return op == "ne" and operand is not None
+    if isinstance(value, list):
+        if op == "ne":
+            return operand not in value
+        if op == "in":
+            return any(v in operand for v in value) if isinstance(operand, list) else operand in value
+        return any(_compare(op, v, operand) for v in value)
+    try:
+        if op == "in":
+            return value in operand if isinstance(operand, (list, tuple, set)) else value == operand
+        if op == "ne":
+            return value != operand
+        if op == "gte":
+            return value >= operand
+        if op == "lte":
+            return value <= operand
+        if op == "gt":
+            return value > operand
+        if op == "lt":
+            return value < operand
+        if op == "icontains":
+            return str(operand).lower() in str(value).lower()
+        if op == "contains":
+            return operand in value if isinstance(value, str) and isinstance(operand, str) else value == operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+FILTER_OPERATORS = {"in", "ne", "gte", "lte", "gt", "lt", "icontains", "contains"}
+
+def filter_clauses(value: Any) -> List[Any]:
+    return value if isinstance(value, list) else [value]
+
+def match_filter(record: Dict[str, Any], filters: Any) -> bool:
+    """True if a memory record satisfies a mem0-style filter."""
+    if not filters:
+        return True
+    if isinstance(filters, list):
+        return all(match_filter(record, clause) for clause in filters)
+    for key, condition in filters.items():
+        if key == "AND":
+            ok = all(match_filter(record, clause) for clause in filter_clauses(condition))
+        elif key == "OR":
+            ok = any(match_filter(record, clause) for clause in filter_clauses(condition))
+        elif key == "NOT":
+            ok = not any(match_filter(record, clause) for clause in filter_clauses(condition))
+        elif key == "metadata" and isinstance(condition, dict) and not set(condition) <= FILTER_OPERATORS:
+            ok = match_filter(record.get("metadata") or {}, condition)
+        else:
+            value = record[key] if key in record else (record.get("metadata") or {}).get(key)
+            if condition == "*":
+                ok = value is not None
+            elif isinstance(condition, dict) and condition and set(condition) <= FILTER_OPERATORS:
+                ok = all(_compare(op, value, operand) for op, operand in condition.items())
+            elif isinstance(value, list):
+                ok = condition in value
+            else:
+                ok = value == condition
+        if not ok:
+            return False
+    return True
@@ -0,0 +1,164 @@
+# Import necessary libraries and modules
+import math
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_const(labels: Optional[Dict[str, str]]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in (labels or {}).items())
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self, const: str = "") -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, k, const)} {_format_value(v)}" for k, v in list(self._values.items())]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+
+class CallbackGauge:
+    """Gauge whose label values are computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], Dict[LabelValues, float]], labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._fn = fn
+
+    def samples(self, const: str = "") -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, k, const)} {_format_value(v)}" for k, v in self._fn().items()]
+
+
+class CallbackCounter(CallbackGauge):
+    """Counter whose label values are read at scrape time from totals kept elsewhere."""
+
+    kind = "counter"
+
+
+class Histogram:
+    """Cumulative-bucket histogram; an observation is one bisect and two additions."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # per-bucket counts (+Inf last), then sum
+
+    def observe(self, *labels: str, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self, const: str = "") -> List[str]:
+        lines = []
+        for labels, series in list(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                le = ",".join(filter(None, [const, 'le="' + _format_value(bound) + '"']))
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels, const)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels, const)} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))
+
+    def callback_gauge(self, name: str, help_text: str, fn: Callable[[], Dict[LabelValues, float]], labels: Sequence[str] = ()) -> CallbackGauge:
+        return self._register(CallbackGauge(name, help_text, fn, labels))
+
+    def callback_counter(self, name: str, help_text: str, fn: Callable[[], Dict[LabelValues, float]], labels: Sequence[str] = ()) -> CallbackCounter:
+        return self._register(CallbackCounter(name, help_text, fn, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def collect(self, const_labels: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Every metric as {name: {"kind", "help", "samples"}}, JSON-serializable so another
+        process can merge it into its own output; `const_labels` are added to every sample.
+        """
+        const = _format_const(const_labels)
+        return {
+            metric.name: {"kind": metric.kind, "help": metric.help, "samples": metric.samples(const)}
+            for metric in self._metrics.values()
+        }
+
+    def render(self, const_labels: Optional[Dict[str, str]] = None, others: Sequence[Dict[str, Dict[str, Any]]] = ()) -> str:
+        """Text exposition of this registry plus the `collect()` output of other processes, merged by metric name."""
+        families = self.collect(const_labels)
+        for other in others:
+            for name, family in other.items():
+                if name in families:
+                    families[name]["samples"].extend(family["samples"])
+                else:
+                    families[name] = {**family, "samples": list(family["samples"])}
+        lines = []
+        for name, family in families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['kind']}")
+            lines.extend(family["samples"])
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,95 @@
+# Import necessary libraries and modules
+import re
+import json
+import asyncio
+from loguru import logger
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from configs.config import MEMORY_PAGE_SIZE
+
+
+# User Detection
+INTRODUCTION_RE = re.compile(
+    r"\b(my name is|my name's|call me|i am|i'm|this is)\s+([A-Za-z][\w-]*)",
+    re.IGNORECASE
+)
+
+def detect_user_id(text: str) -> Optional[str]:
+    """
+    Best-effort guess of the name a user introduces themself with ("I am Bob", "my name is alice").
+    After "I am" / "this is" the word must look like a name (capitalized or containing a
+    digit or hyphen), so "I am hungry" is not taken as an introduction.
+    """
+    for match in INTRODUCTION_RE.finditer(text):
+        phrase, word = match.group(1).lower(), match.group(2)
+        if phrase in ("my name is", "my name's", "call me"):
+            return word
+        if word[0].isupper() and word.lower() not in ("a", "an", "the", "not", "so", "very", "just", "also", "still", "sorry"):
+            return word
+        if any(c.isdigit() or c == "-" for c in word):
+            return word
+    return None
+
+
+# Speculative Tool Calls
+# Tools that change memories; once one runs, earlier speculative reads may be stale.
+WRITE_TOOLS = {"add_short_memory", "add_longterm_memory", "update_memory", "delete_memory"}
+
+# Arguments the server fills in when they are omitted, so a call that spells them out
+# matches a prefetch that didn't (the model often asks for page 1 explicitly).
+TOOL_ARG_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "get_memories": {"page": 1, "page_size": MEMORY_PAGE_SIZE, "fields": None, "updated_since": None},
+}
+
+class ToolPrefetcher:
+    """
+    Tool calls started speculatively at the beginning of a turn, keyed by tool name and
+    arguments, with omitted defaults filled in. When the model asks for the same call, the
+    prefetched result is used instead of a new round trip. Entries are valid for one turn
+    and are dropped as soon as a write tool runs.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.issued = 0
+        self.hits = 0
+
+    @staticmethod
+    def key(tool_name: str, tool_args: Dict[str, Any]) -> str:
+        args = {**TOOL_ARG_DEFAULTS.get(tool_name, {}), **tool_args}
+        return f"{tool_name}:{json.dumps(args, sort_keys=True, default=str)}"
+
+    def start(
+        self,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        call: Callable[[], Awaitable[Any]],
+        spawn: Callable[[Awaitable[Any]], asyncio.Task]
+    ) -> None:
+        key = self.key(tool_name, tool_args)
+        if key not in self._pending:
+            self._pending[key] = spawn(self._guarded(tool_name, call))
+            self.issued += 1
+
+    async def take(self, tool_name: str, tool_args: Dict[str, Any]) -> Tuple[Optional[Any], bool]:
+        """Returns (result, True) for a matching prefetch that succeeded, else (None, False)."""
+        task = self._pending.pop(self.key(tool_name, tool_args), None)
+        if task is None:
+            return None, False
+        result = await task
+        if result is None:
+            return None, False
+        self.hits += 1
+        return result, True
+
+    def invalidate(self) -> None:
+        self._pending.clear()
+
+    @staticmethod
+    async def _guarded(tool_name: str, call: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        # A failed prefetch just means the real call is made when the model asks for it
+        try:
+            return await call()
+        except Exception as e:
+            logger.debug(f"Prefetch of {tool_name} failed: {e}")
+            return None
@@ -0,0 +1,209 @@
+# Import necessary libraries and modules
+import time
+import random
+import asyncio
+from collections import deque
+from loguru import logger
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+
+# Failure Classification
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+TRANSIENT_MARKERS = ("Timeout", "Connection", "RateLimit", "ServiceUnavailable", "InternalServer")
+
+def is_transient(error: BaseException) -> bool:
+    """
+    True for failures worth retrying: timeouts, dropped connections, 429 and 5xx.
+    The SDKs wrap httpx errors in their own types, so those are recognized by
+    status code or by name (e.g. groq's APIConnectionError, RateLimitError).
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS
+    return any(marker in type(error).__name__ for marker in TRANSIENT_MARKERS)
+
+
+# Circuit Breaker
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose circuit is open."""
+
+    def __init__(self, backend: str, retry_in: float):
+        super().__init__(f"{backend} is unavailable (circuit open, retrying in {retry_in:.1f}s)")
+        self.backend = backend
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive transient failures and fails calls
+    fast for `reset_timeout` seconds. Then one probe call is let through (half-open):
+    success closes the circuit, failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def before_call(self) -> None:
+        if self.state == self.OPEN:
+            retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0:
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError(self.name, 0.0)
+            self._probing = True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_cancelled(self) -> None:
+        # Cancelled by the caller, not a verdict on the backend; let another call probe it
+        self._probing = False
+
+    def record_failure(self, error: BaseException) -> None:
+        if not is_transient(error):
+            # The backend answered; a bad request says nothing about its health and ends a failure streak
+            self.record_success()
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} failure(s): {error}")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+# Latency Tracking
+class LatencyWindow:
+    """Latencies of the last `size` successful calls, with a quantile over them."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# Resilience Policy
+class ResiliencePolicy:
+    """
+    Wraps the calls to one upstream backend with a circuit breaker, bounded retries
+    with full-jitter exponential backoff and, optionally, hedging.
+
+    Only idempotent calls are retried or hedged; the rest go through the breaker once.
+    A hedged call starts a duplicate when the first attempt is slower than the
+    operation's recent `hedge_quantile` latency and keeps whichever finishes first.
+    `on_event(event, operation)` reports "retry", "hedge" and "rejected" for metrics.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        retries: int = 2,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        on_event: Optional[Callable[[str, str], None]] = None
+    ):
+        self.name = name
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.on_event = on_event or (lambda event, operation: None)
+        self._latency: Dict[str, LatencyWindow] = {}
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        window = self._latency.get(operation)
+        if not self.hedge or window is None or len(window) < self.hedge_min_samples:
+            return None
+        return window.quantile(self.hedge_quantile)
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], operation: str = "call", idempotent: bool = False) -> Any:
+        attempts = 1 + (self.retries if idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self.on_event("rejected", operation)
+                raise
+            started = time.perf_counter()
+            try:
+                result = await (self._hedged(fn, operation) if idempotent else fn())
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                raise
+            except Exception as e:
+                self.breaker.record_failure(e)
+                if attempt + 1 >= attempts or not is_transient(e):
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"{self.name} {operation} failed ({e}); retry {attempt + 1}/{self.retries} in {delay:.2f}s")
+                self.on_event("retry", operation)
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            self._latency.setdefault(operation, LatencyWindow()).add(time.perf_counter() - started)
+            return result
+
+    async def _hedged(self, fn: Callable[[], Awaitable[Any]], operation: str) -> Any:
+        delay = self.hedge_delay(operation)
+        if delay is None:
+            return await fn()
+
+        tasks = [asyncio.ensure_future(fn())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.on_event("hedge", operation)
+                tasks.append(asyncio.ensure_future(fn()))
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -3,41 +3,587 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import asyncio
+import json
+import time
+import random
+import functools
+import threading
 import traceback
+from datetime import datetime, timezone
+from collections import deque
+from contextlib import asynccontextmanager
 from loguru import logger
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Deque, Set
 
+import uvicorn
 from mcp.server.fastmcp import FastMCP
-from tavily import TavilyClient
-from mem0 import MemoryClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from configs.config import (
+    TAVILY_API_KEY, TAVILY_BASE_URL, MEM0_API_KEY, MEM0_ORG_ID, MEM0_PROJECT_ID, MEM0_HOST,
+    TAVILY_MAX_CONCURRENCY, MEM0_MAX_CONCURRENCY,
+    MEMORY_CACHE_SIZE, MEMORY_CACHE_TTL,
+    SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_BYTES, SEARCH_CACHE_PATH,
+    WRITE_BEHIND_ENABLED, WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL,
+    WRITE_QUEUE_MAX_PENDING, WRITE_MAX_RETRIES, WRITE_SETTLE_TIME,
+    METRICS_SPANS, METRICS_PAYLOAD_SAMPLE_RATE, METRICS_EXPORT_INTERVAL, MEMORY_BACKEND, LOCAL_MEMORY_PATH, LOCAL_MEMORY_DIM,
+    BATCH_MAX_ITEMS, BATCH_MAX_CONCURRENCY, MEMORY_PAGE_SIZE, MEMORY_MAX_PAGE_SIZE,
+    SERVER_HOST, SERVER_PORT, SERVER_LOG_LEVEL, SERVER_WORKERS, SERVER_STATELESS, STATE_STORE, STATE_STORE_RETENTION,
+    UPSTREAM_RETRIES, RETRY_BASE_DELAY_S, RETRY_MAX_DELAY_S, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_S,
+    HEDGE_READS, HEDGE_QUANTILE, HEDGE_MIN_SAMPLES, STATE_POLL_INTERVAL, validate_config
+)
+from src.cache import TTLCache, SearchCache, SingleFlight, normalize_query
+from src.write_behind import MemoryWriteQueue
+from src.metrics import MetricsRegistry, SIZE_BUCKETS
+from src.memory_backends import MemoryBackend, Mem0Backend
+from src.state_store import open_state_store
+from src.resilience import ResiliencePolicy
+
 
-from configs.config import TAVILY_API_KEY, MEM0_API_KEY, MEM0_ORG_ID, MEM0_PROJECT_ID
 
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+validate_config("server")
 
 
 # MCP Server Initialization
-mcp = FastMCP("Memoria", stateless_http=False)
+# With several workers a client's requests can land on any of them, so MCP sessions must not be sticky.
+# The address is passed explicitly: FastMCP's keyword defaults take precedence over its FASTMCP_* variables.
+mcp = FastMCP(
+    "Memoria",
+    host           = SERVER_HOST,
+    port           = SERVER_PORT,
+    log_level      = SERVER_LOG_LEVEL,
+    stateless_http = SERVER_STATELESS or SERVER_WORKERS > 1
+)
+
+# Shared State
+# Cache invalidations and not-yet-flushed writes are published here so every worker sees them.
+state_store = open_state_store(STATE_STORE, retention=STATE_STORE_RETENTION)
+if SERVER_WORKERS > 1 and not state_store.shared:
+    logger.warning("SERVER_WORKERS > 1 with an in-process STATE_STORE: caches are not invalidated across workers.")
+
+
+# Metrics
+# Exposed in Prometheus text format on /metrics next to the MCP route.
+metrics = MetricsRegistry()
+tool_calls_total      = metrics.counter("memoria_tool_calls_total", "Tool invocations.", ["tool"])
+tool_errors_total     = metrics.counter("memoria_tool_errors_total", "Tool invocations that failed.", ["tool"])
+tool_latency          = metrics.histogram("memoria_tool_latency_seconds", "Tool execution time.", ["tool"])
+tool_in_flight        = metrics.gauge("memoria_tool_calls_in_flight", "Tool invocations currently executing.", ["tool"])
+tool_payload_bytes    = metrics.histogram("memoria_tool_payload_bytes", "Serialized tool arguments and results, for a METRICS_PAYLOAD_SAMPLE_RATE sample of calls.", ["tool", "direction"], buckets=SIZE_BUCKETS)
+upstream_latency      = metrics.histogram("memoria_upstream_latency_seconds", "Upstream backend call time (Tavily, memory backend).", ["backend", "operation"])
+upstream_errors_total = metrics.counter("memoria_upstream_errors_total", "Upstream backend calls that raised.", ["backend", "operation"])
+upstream_in_flight    = metrics.gauge("memoria_upstream_in_flight", "Upstream backend calls currently in flight.", ["backend"])
+upstream_resilience   = metrics.counter("memoria_upstream_resilience_events_total", "Upstream retries, hedged requests and calls rejected by an open circuit.", ["backend", "operation", "event"])
+mcp_open_requests     = metrics.gauge("memoria_mcp_open_requests", "MCP HTTP requests in progress (GET: open SSE streams, POST: calls).", ["method"])
+
+class CountOpenRequests:
+    """ASGI middleware keeping memoria_mcp_open_requests for the MCP route."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(mcp.settings.streamable_http_path):
+            return await self.app(scope, receive, send)
+        mcp_open_requests.inc(scope["method"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            mcp_open_requests.dec(scope["method"])
+
+def payload_size(payload: Any) -> int:
+    if isinstance(payload, str):
+        return len(payload.encode("utf-8"))
+    try:
+        return len(json.dumps(payload, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+def is_error_result(result: Any) -> bool:
+    """Tools report a failure by returning {"error": message} instead of raising."""
+    return isinstance(result, dict) and set(result) == {"error"}
+
+def instrumented(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Records call count, errors, latency, in-flight and payload sizes for a tool (place under @mcp.tool())."""
+    tool = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        tool_calls_total.inc(tool)
+        tool_in_flight.inc(tool)
+        started = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+            if is_error_result(result):
+                tool_errors_total.inc(tool)
+        except Exception:
+            tool_errors_total.inc(tool)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            tool_in_flight.dec(tool)
+            tool_latency.observe(tool, value=elapsed)
+            if METRICS_SPANS:
+                logger.info(f"span tool={tool} duration_ms={elapsed * 1000:.1f}")
+        if random.random() < METRICS_PAYLOAD_SAMPLE_RATE:
+            tool_payload_bytes.observe(tool, "request", value=payload_size(kwargs))
+            tool_payload_bytes.observe(tool, "response", value=payload_size(result))
+        return result
+
+    return wrapper
+
+# Lazy Backend Clients
+class LazyClient:
+    """
+    Builds a backend client on first use instead of at import, so the server starts
+    listening without paying for the SDK imports and client setup (mem0's client
+    checks its API key over the network when constructed). Coroutines resolve it
+    with `resolve_async`, which builds it in a thread; attribute access builds it inline.
+    `name` labels the backend in metrics without building it.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str):
+        self._factory = factory
+        self._client: Any = None
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+        self.name = name
+
+    @property
+    def built(self) -> bool:
+        return self._client is not None
+
+    def resolve(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    async def resolve_async(self) -> Any:
+        if self._client is None:
+            # Callers queue on the lock rather than each occupying a thread while the first one builds
+            async with self._async_lock:
+                if self._client is None:
+                    await asyncio.to_thread(self.resolve)
+        return self._client
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.resolve(), attr)
+
 
 # Tavily Search Client Setup
-def get_search_client() -> TavilyClient:
+def get_search_client() -> Any:
+    from tavily import AsyncTavilyClient
+
     api_key = TAVILY_API_KEY
     if not api_key:
         raise EnvironmentError("TAVILY_API_KEY is missing.")
-    return TavilyClient(api_key=api_key)
+    if TAVILY_BASE_URL:
+        return AsyncTavilyClient(api_key=api_key, api_base_url=TAVILY_BASE_URL)
+    return AsyncTavilyClient(api_key=api_key)
+
+search_client = LazyClient(get_search_client, "tavily")
+
+
+# Memory Backend Setup
+def get_memory_backend() -> MemoryBackend:
+    """mem0 cloud (default) or the in-process vector store, per MEMORY_BACKEND."""
+    if MEMORY_BACKEND == "local":
+        if SERVER_WORKERS > 1:
+            raise EnvironmentError("MEMORY_BACKEND=local keeps memories inside one process; run it with SERVER_WORKERS=1.")
+        from src.local_memory import LocalVectorBackend
+
+        return LocalVectorBackend(path=LOCAL_MEMORY_PATH, dim=LOCAL_MEMORY_DIM)
+    if MEMORY_BACKEND != "mem0":
+        raise EnvironmentError(f"Unknown MEMORY_BACKEND: {MEMORY_BACKEND}")
+    from mem0 import AsyncMemoryClient
 
-search_client = get_search_client()
+    # Async mem0 client; its single httpx.AsyncClient is the keep-alive pool shared by all sessions
+    return Mem0Backend(AsyncMemoryClient(
+        api_key    = MEM0_API_KEY,
+        host       = MEM0_HOST,
+        org_id     = MEM0_ORG_ID,
+        project_id = MEM0_PROJECT_ID
+    ))
 
+memory_backend = LazyClient(get_memory_backend, MEMORY_BACKEND)
 
-memory_client = MemoryClient(
-    api_key    = MEM0_API_KEY,
-    org_id     = MEM0_ORG_ID,
-    project_id = MEM0_PROJECT_ID
+async def prewarm_backends() -> None:
+    """Builds the backend clients off the event loop right after startup, so the first tool call finds them ready."""
+    for client in (memory_backend, search_client):
+        try:
+            await client.resolve_async()
+        except Exception as e:
+            # Left to the first call that needs the backend, which reports the error to the model
+            logger.warning(f"Pre-warming {client.name} failed: {e}")
+
+# Per-backend concurrency caps
+upstream_limits: Dict[str, asyncio.Semaphore] = {
+    "tavily":            asyncio.Semaphore(TAVILY_MAX_CONCURRENCY),
+    memory_backend.name: asyncio.Semaphore(MEM0_MAX_CONCURRENCY),
+}
+
+# Per-backend retries, circuit breakers and hedging; only reads are retried or hedged
+# (writes are retried by the write-behind queue, which must not add a memory twice)
+READ_OPERATIONS = {"search", "get_all", "get", "history"}
+
+def resilience_policy(backend: str) -> ResiliencePolicy:
+    return ResiliencePolicy(
+        backend,
+        retries           = UPSTREAM_RETRIES,
+        base_delay        = RETRY_BASE_DELAY_S,
+        max_delay         = RETRY_MAX_DELAY_S,
+        failure_threshold = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout     = BREAKER_RESET_S,
+        hedge             = HEDGE_READS,
+        hedge_quantile    = HEDGE_QUANTILE,
+        hedge_min_samples = HEDGE_MIN_SAMPLES,
+        on_event          = lambda event, operation: upstream_resilience.inc(backend, operation, event)
+    )
+
+upstream_policies: Dict[str, ResiliencePolicy] = {backend: resilience_policy(backend) for backend in upstream_limits}
+
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+metrics.callback_gauge(
+    "memoria_upstream_circuit_state", "Upstream circuit breaker state (0 closed, 1 half-open, 2 open).",
+    lambda: {(backend,): CIRCUIT_STATES[policy.breaker.state] for backend, policy in upstream_policies.items()},
+    ["backend"]
 )
 
+async def call_upstream(client: LazyClient, operation: str, *args, **kwargs) -> Any:
+    """
+    Awaits `client.<operation>(*args, **kwargs)` through the backend's resilience policy,
+    building the client off the event loop if this is its first use.
+    Every attempt (retries and hedges included) holds one of the backend's concurrency slots.
+    """
+    backend = client.name
+    fn = getattr(await client.resolve_async(), operation)
+
+    async def attempt() -> Any:
+        async with upstream_limits[backend]:
+            upstream_in_flight.inc(backend)
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                upstream_errors_total.inc(backend, operation)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                upstream_in_flight.dec(backend)
+                upstream_latency.observe(backend, operation, value=elapsed)
+                if METRICS_SPANS:
+                    logger.info(f"span backend={backend} operation={operation} duration_ms={elapsed * 1000:.1f}")
+
+    return await upstream_policies[backend].call(attempt, operation, idempotent=operation in READ_OPERATIONS)
+
+
+# Read-through Memory Cache
+# Entries are tagged with "user:<id>" / "memory:<id>" so writes invalidate every read they affect.
+memory_cache = TTLCache(maxsize=MEMORY_CACHE_SIZE, ttl=MEMORY_CACHE_TTL)
+
+def memory_ids(result: Any) -> List[str]:
+    """Collects the memory ids contained in a mem0 response."""
+    if isinstance(result, dict):
+        result = result.get("results", result.get("memories", [result]))
+    if not isinstance(result, list):
+        return []
+    return [str(m["id"]) for m in result if isinstance(m, dict) and m.get("id")]
+
+def filter_user_ids(filters: Any) -> Set[str]:
+    """Collects every user_id referenced anywhere in a (possibly nested) filter."""
+    found: Set[str] = set()
+    if isinstance(filters, dict):
+        for key, value in filters.items():
+            if key == "user_id":
+                if isinstance(value, str):
+                    found.add(value)
+                elif isinstance(value, dict) and isinstance(value.get("in"), list):
+                    found.update(str(v) for v in value["in"])
+            else:
+                found |= filter_user_ids(value)
+    elif isinstance(filters, list):
+        for item in filters:
+            found |= filter_user_ids(item)
+    return found
+
+# Cross-worker Invalidation
+# A shared store call can wait on another worker's write lock, so none runs on the event loop:
+# a background task publishes this worker's invalidations and applies the other workers'
+# every STATE_POLL_INTERVAL seconds, which bounds how long a cross-worker read can be stale.
+invalidation_outbox: Deque[List[str]] = deque()
+invalidation_seq: Optional[int] = None
+state_store_tasks: Set[asyncio.Future] = set()
+
+def invalidate_tags(*tags: str) -> None:
+    for tag in tags:
+        memory_cache.invalidate_tag(tag)
+    if state_store.shared:
+        invalidation_outbox.append(list(tags))
+
+def exchange_invalidations() -> List[List[str]]:
+    """Publishes the queued invalidations and returns those published since the last call (runs in a thread)."""
+    global invalidation_seq
+    while invalidation_outbox:
+        state_store.publish("invalidate", invalidation_outbox.popleft())
+    invalidation_seq, messages = state_store.poll("invalidate", invalidation_seq)
+    return messages
+
+async def sync_invalidations() -> None:
+    while True:
+        try:
+            for tags in await asyncio.to_thread(exchange_invalidations):
+                for tag in tags:
+                    memory_cache.invalidate_tag(tag)
+        except Exception as e:
+            logger.warning(f"Syncing cache invalidations failed: {e}")
+        await asyncio.sleep(STATE_POLL_INTERVAL)
+
+def update_state_store(fn: Callable[..., Any], *args) -> None:
+    """Runs a shared store write in a thread without waiting for it; shutdown waits for these before closing the store."""
+    future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    state_store_tasks.add(future)
+    future.add_done_callback(state_store_tasks.discard)
+
+def cached_read(key: Any) -> Any:
+    return memory_cache.get(key)
+
+def invalidate_user(user_id: str) -> None:
+    invalidate_tags(f"user:{user_id}", "search:unscoped")
+
+def invalidate_memory(memory_id: str, user_id: Optional[str] = None) -> None:
+    # An edited memory can change the ranking of any search, and every page of its owner's
+    # memories: deleting it shifts later pages, updating it matters to updated_since reads
+    invalidate_tags(f"memory:{memory_id}", "search", *([f"user:{user_id}"] if user_id else []))
+
+
+# Write-behind Memory Queue
+# Memory writes are acknowledged once queued, then coalesced per user_id/run_id/agent_id and flushed in batches.
+write_queue = MemoryWriteQueue(
+    add_fn         = lambda **kwargs: call_upstream(memory_backend, "add", **kwargs),
+    batch_size     = WRITE_BATCH_SIZE,
+    flush_interval = WRITE_FLUSH_INTERVAL,
+    max_pending    = WRITE_QUEUE_MAX_PENDING,
+    max_retries    = WRITE_MAX_RETRIES,
+    # The local store indexes an add before returning; mem0 acknowledges it and indexes it in the background
+    settle_time    = 0.0 if MEMORY_BACKEND == "local" else WRITE_SETTLE_TIME,
+    # The flushed write is now (or soon) visible upstream, so cached reads for the user are stale
+    on_flushed     = lambda add_kwargs, write_ids, ok: flushed_writes(add_kwargs["user_id"], write_ids, ok)
+)
+
+# Pending writes are mirrored to a shared store for other workers; the TTL only matters if a worker dies mid-flush
+PENDING_WRITE_TTL = max(60.0, WRITE_FLUSH_INTERVAL * (WRITE_MAX_RETRIES + 2) * 4)
+
+def settle_pending_markers(user_id: str, write_ids: List[str], ok: bool) -> None:
+    for write_id in write_ids:
+        key = f"pending:{user_id}:{write_id}"
+        entry = state_store.get(key) if ok and write_queue.settle_time > 0 else None
+        if entry is not None:
+            # Still reported to other workers until the backend has had time to index it
+            state_store.set(key, entry, ttl=write_queue.settle_time)
+        else:
+            state_store.delete(key)
+
+def flushed_writes(user_id: str, write_ids: List[str], ok: bool) -> None:
+    if state_store.shared:
+        update_state_store(settle_pending_markers, user_id, write_ids, ok)
+    invalidate_user(user_id)
+
+async def store_memory(messages: List[Dict[str, str]], **add_kwargs) -> None:
+    """Queues a mem0 `add` when write-behind is enabled, otherwise performs it inline."""
+    if WRITE_BEHIND_ENABLED:
+        write_id = await write_queue.enqueue(messages, **add_kwargs)
+        if write_id and state_store.shared:
+            await asyncio.to_thread(state_store.set, f"pending:{add_kwargs['user_id']}:{write_id}", {
+                "messages": messages,
+                "add_kwargs": {key: add_kwargs.get(key) for key in ("run_id", "agent_id")},
+            }, PENDING_WRITE_TTL)
+    else:
+        await call_upstream(memory_backend, "add", messages=messages, **add_kwargs)
+    invalidate_user(add_kwargs["user_id"])
+
+async def pending_writes(user_id: str) -> List[Any]:
+    """
+    (add kwargs, messages) of the user's unflushed writes, and of flushed ones still settling,
+    from every worker when the store is shared.
+    """
+    if state_store.shared:
+        entries = await asyncio.to_thread(state_store.scan, f"pending:{user_id}:")
+        return [(entry["add_kwargs"], entry["messages"]) for entry in entries]
+    return write_queue.pending_for(user_id)
+
+def with_pending_writes(user_id: str, memories: Any, pending_entries: List[Any]) -> Any:
+    """Appends the user's pending writes (from `pending_writes`) to a get_all result (read-your-writes)."""
+    pending = [
+        {
+            "memory":   f"{message.get('role', 'user')}: {message.get('content', '')}",
+            "user_id":  user_id,
+            "run_id":   add_kwargs.get("run_id"),
+            "agent_id": add_kwargs.get("agent_id"),
+            "status":   "pending",
+        }
+        for add_kwargs, batch in pending_entries
+        for message in batch
+    ]
+    if not pending:
+        return memories
+    if isinstance(memories, dict) and isinstance(memories.get("results"), list):
+        return {**memories, "results": memories["results"] + pending}
+    if isinstance(memories, list):
+        return memories + pending
+    return memories
+
+# Web Search Cache
+# Identical queries (after normalization) are served from cache, and concurrent misses share one upstream call.
+search_cache = SearchCache(max_bytes=SEARCH_CACHE_MAX_BYTES, ttl=SEARCH_CACHE_TTL, path=SEARCH_CACHE_PATH)
+search_flight = SingleFlight()
+
+
+# Shared Read Paths
+# Used by the single-item tools and their batch variants, so both go through the same caches and upstream caps.
+async def fetch_search(query: str) -> Any:
+    cache_key = normalize_query(query)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def fetch() -> Any:
+        results = await call_upstream(search_client, "search", query)
+        if results:
+            search_cache.set(cache_key, results)
+        return results
+
+    return await search_flight.do(cache_key, fetch)
+
+def utc_timestamp(value: str) -> str:
+    """Normalizes an ISO-8601 timestamp to UTC (naive values are taken as UTC); raises ValueError otherwise."""
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+def memory_page(memories: Any, page: int, page_size: int) -> Dict[str, Any]:
+    """Turns a paginated get_all response ({"count", "results"}, or a bare list if the backend ignored paging) into one page."""
+    if isinstance(memories, dict) and isinstance(memories.get("results"), list):
+        results, count = memories["results"], memories.get("count")
+    elif isinstance(memories, list):
+        start = (page - 1) * page_size
+        results, count = memories[start:start + page_size], len(memories)
+    else:
+        results, count = [], 0
+
+    has_more = page * page_size < count if isinstance(count, int) else len(results) >= page_size
+    return {
+        "count":     count,
+        "page":      page,
+        "page_size": page_size,
+        "results":   results,
+        "next_page": page + 1 if has_more else None,
+    }
+
+def select_fields(payload: Any, fields: Optional[List[str]]) -> Any:
+    """Keeps only `fields` (plus "id") of each memory in a page."""
+    if not fields or not isinstance(payload, dict) or not isinstance(payload.get("results"), list):
+        return payload
+    keep = {"id", *fields}
+    return {**payload, "results": [
+        {key: value for key, value in m.items() if key in keep} if isinstance(m, dict) else m
+        for m in payload["results"]
+    ]}
+
+async def fetch_user_memories(
+    user_id: str,
+    page: int = 1,
+    page_size: int = MEMORY_PAGE_SIZE,
+    updated_since: Optional[str] = None
+) -> Any:
+    """
+    One page of the user's memories, optionally only those updated at or after `updated_since`.
+    Each page is fetched and cached on its own, so the full set is never materialized. Pages
+    carry `as_of`, the time they were read, to pass as `updated_since` on a later call.
+    """
+    cache_key = ("user", user_id, page, page_size, updated_since)
+    pending = await pending_writes(user_id)
+    cached = cached_read(cache_key)
+    if cached is None:
+        # We construct the filter correctly here, so the model doesn't have to.
+        filters: Dict[str, Any] = {"user_id": user_id}
+        if updated_since:
+            filters = {"AND": [filters, {"updated_at": {"gte": updated_since}}]}
+        logger.info(f"🔍 Getting memories with filter: {filters} (page {page}, size {page_size})")
+
+        as_of = datetime.now(timezone.utc).isoformat()
+        memories = await call_upstream(memory_backend, "get_all",
+            filters=filters,
+            version="v2",
+            page=page,
+            page_size=page_size
+        )
+        cached = {**memory_page(memories, page, page_size), "as_of": as_of}
+        # A page read while writes are queued or settling may predate them; caching it would
+        # hide those writes for MEMORY_CACHE_TTL once they stop being reported as pending
+        if not pending:
+            memory_cache.set(cache_key, cached, tags=[
+                f"user:{user_id}", *(f"memory:{m}" for m in memory_ids(cached))
+            ])
+    # Unflushed writes are newer than anything upstream, so they belong on the first page
+    return with_pending_writes(user_id, cached, pending) if page == 1 else cached
+
+async def fetch_memory(memory_id: str) -> Any:
+    cached = cached_read(("memory", memory_id))
+    if cached is not None:
+        return cached
+
+    memory = await call_upstream(memory_backend, "get", memory_id=memory_id)
+    tags = [f"memory:{memory_id}"]
+    if isinstance(memory, dict) and memory.get("user_id"):
+        tags.append(f"user:{memory['user_id']}")
+    memory_cache.set(("memory", memory_id), memory, tags=tags)
+    return memory
+
+async def memory_owner(memory_id: str) -> Optional[str]:
+    """The user_id a memory belongs to (None if it can't be looked up), read before the memory is changed."""
+    try:
+        memory = await fetch_memory(memory_id)
+    except Exception as e:
+        logger.warning(f"Could not look up the owner of memory {memory_id}: {e}")
+        return None
+    return memory.get("user_id") if isinstance(memory, dict) else None
+
+async def fan_out(items: List[str], fetch: Callable[[str], Awaitable[Any]], item_key: str, value_key: str) -> Any:
+    """
+    Runs `fetch` for each distinct item, at most BATCH_MAX_CONCURRENCY at a time.
+    Returns one entry per item, carrying either its value or its own error.
+    """
+    items = list(dict.fromkeys(item for item in items if item))
+    if not items:
+        return {"error": f"{item_key}s cannot be empty."}
+    if len(items) > BATCH_MAX_ITEMS:
+        return {"error": f"at most {BATCH_MAX_ITEMS} {item_key}s per call."}
+
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def one(item: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return {item_key: item, value_key: await fetch(item)}
+            except Exception as e:
+                logger.error(f"{fetch.__name__}({item!r}) error: {e}")
+                return {item_key: item, "error": str(e)}
+
+    return await asyncio.gather(*(one(item) for item in items))
+
+
 #  Web Search Tool
 @mcp.tool()
-def web_search(query: str) -> Any:
+@instrumented
+async def web_search(query: str) -> Any:
     """
     Perform a web search using the Tavily API.
 
@@ -48,22 +594,42 @@ def web_search(query: str) -> Any:
         The search results or an error message.
     """
     try:
-        results = search_client.search(query)
+        results = await fetch_search(query)
         return results or "No results found."
     except Exception as e:
         logger.error(f"web_search error: {e}")
         logger.debug(traceback.format_exc())
-        return f"Search failed: {e}"
+        return {"error": f"Search failed: {e}"}
+
+@mcp.tool()
+@instrumented
+async def web_search_batch(queries: List[str]) -> Any:
+    """
+    Perform several independent web searches at once. Prefer this over repeated `web_search` calls.
+
+    Args:
+        queries: The search query strings.
+
+    Returns:
+        One {"query", "results"} entry per query, or {"query", "error"} for a query that failed.
+    """
+    try:
+        return await fan_out(queries, fetch_search, "query", "results")
+    except Exception as e:
+        logger.error(f"web_search_batch error: {e}")
+        logger.debug(traceback.format_exc())
+        return {"error": f"Batch search failed: {e}"}
 
 
 # Memory Tools (Short-term and Long-term)
 @mcp.tool()
-def add_short_memory(
+@instrumented
+async def add_short_memory(
     messages: List[Dict[str, str]],
     user_id: str,
     run_id: str,
     async_mode: bool = True
-) -> str:
+) -> Any:
     """
     Store a sequence of messages as short-term memory for this session.
     
@@ -74,7 +640,7 @@ def add_short_memory(
         async_mode: If True, returns immediately and processes in background.
     """
     try:
-        memory_client.add(
+        await store_memory(
             messages   = messages,
             user_id    = user_id,
             run_id     = run_id,
@@ -86,15 +652,16 @@ def add_short_memory(
     except Exception as e:
         logger.error(f"add_episodic_memory error: {e}")
         logger.debug(traceback.format_exc())
-        return f"Failed to add episodic memory: {e}"
+        return {"error": f"Failed to add episodic memory: {e}"}
 
 @mcp.tool()
-def add_longterm_memory(
+@instrumented
+async def add_longterm_memory(
     messages: List[Dict[str, str]],
     user_id: str,
     agent_id: Optional[str] = None,
     async_mode: bool = True
-) -> str:
+) -> Any:
     """
     Use this tool to persist key metadata, preferences, and critical facts long-term.
     
@@ -105,7 +672,7 @@ def add_longterm_memory(
         async_mode: If True, returns immediately and processes in background.
     """
     try:
-        memory_client.add(
+        await store_memory(
             messages   = messages,
             user_id    = user_id,
             agent_id   = agent_id,
@@ -118,12 +685,13 @@ def add_longterm_memory(
     except Exception as e:
         logger.error(f"add_longterm_memory error: {e}")
         logger.debug(traceback.format_exc())
-        return f"Failed to add long-term memory: {e}"
+        return {"error": f"Failed to add long-term memory: {e}"}
 
 # Memory Retrieval & Management Tools
 
 @mcp.tool()
-def search_memories_v2(
+@instrumented
+async def search_memories_v2(
     query: str,
     filters: Dict[str, Any]
 ) -> Any:
@@ -146,48 +714,88 @@ def search_memories_v2(
         Search results or an error message.
     """
     try:
-        return memory_client.search(
+        cache_key = ("search", query, json.dumps(filters, sort_keys=True, default=str))
+        cached = cached_read(cache_key)
+        if cached is not None:
+            return cached
+
+        results = await call_upstream(memory_backend, "search",
             query   = query,
             version = "v2",
             filters = filters
         )
+        user_tags = [f"user:{u}" for u in filter_user_ids(filters)] or ["search:unscoped"]
+        memory_cache.set(cache_key, results, tags=[
+            "search", *user_tags, *(f"memory:{m}" for m in memory_ids(results))
+        ])
+        return results
     except Exception as e:
         logger.error(f"search_memories_v2 error: {e}")
         logger.debug(traceback.format_exc())
-        return f"Search v2 failed: {e}"
+        return {"error": f"Search v2 failed: {e}"}
 
 @mcp.tool()
-def get_memories(user_id: str) -> Any:
+@instrumented
+async def get_memories(
+    user_id: str,
+    page: int = 1,
+    page_size: int = MEMORY_PAGE_SIZE,
+    fields: Optional[List[str]] = None,
+    updated_since: Optional[str] = None
+) -> Any:
     """
-    Retrieves all memories associated with a specific user_id.
+    Retrieves the memories associated with a specific user_id, one page at a time.
     Call this at the start of a session to understand the user's history.
 
     Args:
-        user_id: The stable identifier for the user (e.g., "Sherif").
+        user_id:       The stable identifier for the user (e.g., "Sherif").
+        page:          1-based page number; follow `next_page` for more.
+        page_size:     Memories per page.
+        fields:        Optional memory fields to return (e.g. ["memory", "updated_at"]); "id" is always included.
+        updated_since: Optional ISO-8601 timestamp; only memories updated at or after it are returned.
+                       Pass the `as_of` of an earlier call to fetch just what changed since.
 
     Returns:
-        A list of matching memory objects or an empty list if none are found.
+        {"count", "page", "page_size", "results", "next_page", "as_of"} or an error message.
     """
     if not user_id:
-        return "Error: user_id cannot be empty."
+        return {"error": "user_id cannot be empty."}
+    if page < 1 or not 1 <= page_size <= MEMORY_MAX_PAGE_SIZE:
+        return {"error": f"page must be >= 1 and page_size between 1 and {MEMORY_MAX_PAGE_SIZE}."}
     try:
-        # We construct the filter correctly here, so the model doesn't have to.
-        filters = {"user_id": user_id}
-        logger.info(f"🔍 Getting memories with filter: {filters}")
-        
-        memories = memory_client.get_all(
-            filters=filters,
-            version="v2"
-        )
-        return memories or [] # Always return a list, even if it's empty.
-    
+        if updated_since:
+            updated_since = utc_timestamp(updated_since)
+    except ValueError:
+        return {"error": f"updated_since must be an ISO-8601 timestamp, got {updated_since!r}."}
+    try:
+        return select_fields(await fetch_user_memories(user_id, page, page_size, updated_since), fields)
     except Exception as e:
         logger.error(f"get_memories error: {e}")
         logger.debug(traceback.format_exc())
-        return f"Retrieving memories failed: {e}"
+        return {"error": f"Retrieving memories failed: {e}"}
 
 @mcp.tool()
-def memory_history(memory_id: str) -> Any:
+@instrumented
+async def get_memories_batch(user_ids: List[str]) -> Any:
+    """
+    Retrieves the first page of memories of several users at once; page further with `get_memories`.
+
+    Args:
+        user_ids: The stable identifiers of the users.
+
+    Returns:
+        One {"user_id", "memories"} entry per user, or {"user_id", "error"} for a user that failed.
+    """
+    try:
+        return await fan_out(user_ids, fetch_user_memories, "user_id", "memories")
+    except Exception as e:
+        logger.error(f"get_memories_batch error: {e}")
+        logger.debug(traceback.format_exc())
+        return {"error": f"Retrieving memories failed: {e}"}
+
+@mcp.tool()
+@instrumented
+async def memory_history(memory_id: str) -> Any:
     """
     Fetch the full edit history of a single memory.
 
@@ -198,14 +806,21 @@ def memory_history(memory_id: str) -> Any:
         A list of historical versions or an error message.
     """
     try:
-        return memory_client.history(memory_id=memory_id)
+        cached = cached_read(("history", memory_id))
+        if cached is not None:
+            return cached
+
+        history = await call_upstream(memory_backend, "history", memory_id=memory_id)
+        memory_cache.set(("history", memory_id), history, tags=[f"memory:{memory_id}"])
+        return history
     except Exception as e:
         logger.error(f"memory_history error: {e}")
         logger.debug(traceback.format_exc())
-        return f"History lookup failed: {e}"
+        return {"error": f"History lookup failed: {e}"}
 
 @mcp.tool()
-def get_memory(memory_id: str) -> Any:
+@instrumented
+async def get_memory(memory_id: str) -> Any:
     """
     Retrieve a single memory by its ID.
 
@@ -216,14 +831,34 @@ def get_memory(memory_id: str) -> Any:
         The memory object or an error message.
     """
     try:
-        return memory_client.get(memory_id=memory_id)
+        return await fetch_memory(memory_id)
     except Exception as e:
         logger.error(f"get_memory error: {e}")
         logger.debug(traceback.format_exc())
-        return f"Retrieving memory failed: {e}"
+        return {"error": f"Retrieving memory failed: {e}"}
+
+@mcp.tool()
+@instrumented
+async def get_memory_batch(memory_ids: List[str]) -> Any:
+    """
+    Retrieve several memories by their IDs at once.
+
+    Args:
+        memory_ids: The unique identifiers of the memories.
+
+    Returns:
+        One {"memory_id", "memory"} entry per ID, or {"memory_id", "error"} for a memory that failed.
+    """
+    try:
+        return await fan_out(memory_ids, fetch_memory, "memory_id", "memory")
+    except Exception as e:
+        logger.error(f"get_memory_batch error: {e}")
+        logger.debug(traceback.format_exc())
+        return {"error": f"Retrieving memories failed: {e}"}
 
 @mcp.tool()
-def update_memory(
+@instrumented
+async def update_memory(
     memory_id: str,
     text: Optional[str] = None,
     metadata: Optional[Dict[str, Any]] = None
@@ -240,18 +875,22 @@ def update_memory(
         The updated memory object or an error message.
     """
     try:
-        return memory_client.update(
+        owner = await memory_owner(memory_id)
+        updated = await call_upstream(memory_backend, "update",
             memory_id = memory_id,
             text      = text,
             metadata  = metadata
         )
+        invalidate_memory(memory_id, owner)
+        return updated
     except Exception as e:
         logger.error(f"update_memory error: {e}")
         logger.debug(traceback.format_exc())
-        return f"Updating memory failed: {e}"
+        return {"error": f"Updating memory failed: {e}"}
 
 @mcp.tool()
-def delete_memory(memory_id: str) -> Any:
+@instrumented
+async def delete_memory(memory_id: str) -> Any:
     """
     Delete a memory entry by its ID.
 
@@ -262,16 +901,155 @@ def delete_memory(memory_id: str) -> Any:
         A confirmation of deletion or an error message.
     """
     try:
-        return memory_client.delete(memory_id=memory_id)
+        owner = await memory_owner(memory_id)
+        deleted = await call_upstream(memory_backend, "delete", memory_id=memory_id)
+        invalidate_memory(memory_id, owner)
+        return deleted
     except Exception as e:
         logger.error(f"delete_memory error: {e}")
         logger.debug(traceback.format_exc())
-        return f"Deleting memory failed: {e}"
+        return {"error": f"Deleting memory failed: {e}"}
+
+
+# Cache and queue metrics, read at scrape time
+metrics.callback_counter("memoria_cache_hits_total", "Cache hits since start.", lambda: {
+    ("memory",): memory_cache.hits, ("search",): search_cache.hits
+}, ["cache"])
+metrics.callback_counter("memoria_cache_misses_total", "Cache misses since start.", lambda: {
+    ("memory",): memory_cache.misses, ("search",): search_cache.misses
+}, ["cache"])
+metrics.callback_gauge("memoria_cache_entries", "Entries currently cached.", lambda: {
+    ("memory",): len(memory_cache), ("search",): len(search_cache)
+}, ["cache"])
+metrics.callback_gauge("memoria_write_queue_pending", "Memory messages queued or being flushed.", lambda: {
+    (): write_queue.pending
+})
+
+
+# Metrics Endpoint
+# Per-worker Metrics
+# A scrape reaches one worker, so with several workers each labels its series worker="<pid>" and
+# publishes a snapshot to the shared store every METRICS_EXPORT_INTERVAL seconds; /metrics merges the
+# other workers' latest snapshots into its own live values. A snapshot expires if its worker stops refreshing it.
+worker_labels = {"worker": str(os.getpid())} if SERVER_WORKERS > 1 else None
+exports_metrics = worker_labels is not None and state_store.shared
+
+async def export_metrics() -> None:
+    while True:
+        await asyncio.sleep(METRICS_EXPORT_INTERVAL)
+        try:
+            snapshot = {"pid": os.getpid(), "families": metrics.collect(worker_labels)}
+            await asyncio.to_thread(state_store.set, f"metrics:{os.getpid()}", snapshot, 3 * METRICS_EXPORT_INTERVAL)
+        except Exception as e:
+            logger.warning(f"Publishing metrics snapshot failed: {e}")
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    others = []
+    if exports_metrics:
+        snapshots = await asyncio.to_thread(state_store.scan, "metrics:")
+        others = [snapshot["families"] for snapshot in snapshots if snapshot["pid"] != os.getpid()]
+    return PlainTextResponse(metrics.render(worker_labels, others), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Cache Statistics
+@mcp.resource("memoria://stats/cache")
+def cache_stats() -> str:
+    """Hit/miss counters and occupancy of the in-process memory and search caches."""
+    return json.dumps({
+        "memory": memory_cache.stats(),
+        "search": {**search_cache.stats(), "coalesced": search_flight.coalesced},
+    })
+
+
+# Server Startup
+async def shutdown() -> None:
+    """
+    Drains queued memory writes and persists local state before the worker exits.
+    Every step runs even if an earlier one fails, so the clients and state store are always closed.
+    """
+    # Only the clients that were built hold connection pools
+    async def close_backend() -> None:
+        if memory_backend.built:
+            await memory_backend.close()
+
+    async def close_search_client() -> None:
+        if search_client.built:
+            await search_client.close()
+
+    async def save_search_cache() -> None:
+        search_cache.save()
+
+    async def close_state_store() -> None:
+        # The drain may have queued marker updates and invalidations; land them before closing
+        if state_store.shared:
+            await asyncio.gather(*state_store_tasks, return_exceptions=True)
+            await asyncio.to_thread(exchange_invalidations)
+        if exports_metrics:
+            await asyncio.to_thread(state_store.delete, f"metrics:{os.getpid()}")
+        state_store.close()
+
+    for step in (write_queue.drain, save_search_cache, close_backend, close_search_client, close_state_store):
+        try:
+            await step()
+        except Exception as e:
+            logger.error(f"Shutdown step {step.__name__} failed: {e}")
+            logger.debug(traceback.format_exc())
+
+def create_app() -> Starlette:
+    """The streamable-HTTP app with the shutdown hook; also the uvicorn factory each worker process calls."""
+    app = mcp.streamable_http_app()
+    app.add_middleware(CountOpenRequests)
+    session_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        async with session_lifespan(app):
+            background = [asyncio.create_task(prewarm_backends())]
+            if state_store.shared:
+                background.append(asyncio.create_task(sync_invalidations()))
+            if exports_metrics:
+                background.append(asyncio.create_task(export_metrics()))
+            try:
+                yield
+            finally:
+                for task in background:
+                    task.cancel()
+                await shutdown()
+
+    app.router.lifespan_context = lifespan
+    return app
+
+async def serve() -> None:
+    """Runs a single worker on the current event loop."""
+    config = uvicorn.Config(
+        create_app(),
+        host      = mcp.settings.host,
+        port      = mcp.settings.port,
+        log_level = mcp.settings.log_level.lower()
+    )
+    await uvicorn.Server(config).serve()
+
+def serve_workers() -> None:
+    """Runs SERVER_WORKERS processes on one port; uvicorn's supervisor restarts workers that die."""
+    logger.info(f"Starting {SERVER_WORKERS} stateless workers on {mcp.settings.host}:{mcp.settings.port}")
+    uvicorn.run(
+        "src.server:create_app",
+        factory   = True,
+        host      = mcp.settings.host,
+        port      = mcp.settings.port,
+        workers   = SERVER_WORKERS,
+        app_dir   = ROOT_DIR,
+        log_level = mcp.settings.log_level.lower()
+    )
 
 
 if __name__ == "__main__":
     try:
-        mcp.run(transport="streamable-http")
+        if SERVER_WORKERS > 1:
+            serve_workers()
+        else:
+            asyncio.run(serve())
     except KeyboardInterrupt:
         logger.info("Server stopped by user.")
     except Exception as e:
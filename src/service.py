@@ -0,0 +1,318 @@
+# Import necessary libraries and modules
+from __future__ import annotations
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import uuid
+import asyncio
+import traceback
+from contextlib import AsyncExitStack, asynccontextmanager
+from loguru import logger
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# The Groq and fastmcp SDKs are imported by AgentService.start, so loading this module stays cheap
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+    from fastmcp import Client
+
+from configs.config import (
+    GROQ_API_KEY, GROQ_BASE_URL, MCP_SERVER_URL,
+    HISTORY_TOKEN_BUDGET, HISTORY_SUMMARY_MAX_TOKENS,
+    SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_SESSIONS, SERVICE_MAX_CONCURRENT_TURNS,
+    SERVICE_ADMISSION_TIMEOUT, SESSION_IDLE_TTL, validate_config
+)
+from src.client import AgentSession, build_system_prompt, prewarm_groq, run_agent_turn, to_groq_tools
+from src.history import ConversationHistory
+
+
+
+class ServiceOverloaded(Exception):
+    """Raised when admission control rejects new work."""
+
+
+# Session Table
+class ServiceSession:
+    """One conversation held by the service: its agent state plus bookkeeping for eviction."""
+
+    def __init__(self, session_id: str, agent: AgentSession):
+        self.id = session_id
+        self.agent = agent
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+        self.busy = False
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            "run_id": self.agent.run_id,
+            "user_id": self.agent.user_id,
+            "created_at": self.created_at,
+            "idle_s": round(time.monotonic() - self.last_used, 3),
+            "busy": self.busy,
+            "history": self.agent.history.stats(),
+        }
+
+
+class AgentService:
+    """
+    Runs `run_agent_turn` for many concurrent conversations over one shared
+    MCP client and one Groq client. Sessions live in an in-memory table and are
+    evicted after `idle_ttl` seconds without a turn; concurrent turns are capped
+    by a semaphore and requests that cannot get a slot within
+    `admission_timeout` seconds are rejected.
+    """
+
+    def __init__(self, max_sessions: int, max_concurrent_turns: int, admission_timeout: float, idle_ttl: float):
+        self.max_sessions = max_sessions
+        self.max_concurrent_turns = max_concurrent_turns
+        self.admission_timeout = admission_timeout
+        self.idle_ttl = idle_ttl
+        self.sessions: Dict[str, ServiceSession] = {}
+        self.turn_slots = asyncio.Semaphore(max_concurrent_turns)
+        self.active_turns = 0
+        self.rejected = 0
+        self.mcp_client: Optional[Client] = None
+        self.groq_client: Optional[AsyncGroq] = None
+        self.groq_tools: List[Dict[str, Any]] = []
+        self._evictor: Optional[asyncio.Task] = None
+        self._turn_tasks: Set[asyncio.Task] = set()
+
+    async def start(self, stack: AsyncExitStack) -> None:
+        from groq import AsyncGroq
+        from fastmcp import Client
+        from fastmcp.client.transports import StreamableHttpTransport
+
+        transport = StreamableHttpTransport(MCP_SERVER_URL)
+        self.mcp_client = await stack.enter_async_context(Client(transport=transport))
+        self.groq_tools = to_groq_tools(await self.mcp_client.list_tools())
+        self.groq_client = AsyncGroq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, max_retries=0)
+        await prewarm_groq(self.groq_client)
+        self._evictor = asyncio.create_task(self._evict_idle())
+        logger.info(f"✅ Agent service connected to {MCP_SERVER_URL} with {len(self.groq_tools)} tools")
+
+    async def stop(self) -> None:
+        if self._evictor:
+            self._evictor.cancel()
+        await asyncio.gather(*self._turn_tasks, return_exceptions=True)
+        await asyncio.gather(*(self.close_session(session_id) for session_id in list(self.sessions)))
+
+    def create_session(self, user_id: Optional[str] = None) -> ServiceSession:
+        if len(self.sessions) >= self.max_sessions:
+            self.rejected += 1
+            raise ServiceOverloaded(f"Session limit of {self.max_sessions} reached")
+
+        run_id = str(uuid.uuid4())
+        history = ConversationHistory(
+            build_system_prompt(),
+            token_budget       = HISTORY_TOKEN_BUDGET,
+            summary_max_tokens = HISTORY_SUMMARY_MAX_TOKENS,
+            memory_hint        = f"Details of these turns were saved to memory with run_id={run_id}; use `search_memories_v2` to recall them."
+        )
+        agent = AgentSession(history, run_id, output=lambda event, text="": None)
+        if user_id:
+            agent.user_id = user_id
+
+        session = ServiceSession(uuid.uuid4().hex, agent)
+        self.sessions[session.id] = session
+        logger.info(f"🤖 Session {session.id} started (run_id={run_id})")
+        return session
+
+    async def close_session(self, session_id: str) -> bool:
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        await session.agent.drain()
+        session.agent.tracer.close()
+        logger.info(f"Session {session_id} closed")
+        return True
+
+    async def admit(self) -> None:
+        """Waits for a turn slot, rejecting the request if none frees up in time."""
+        try:
+            await asyncio.wait_for(self.turn_slots.acquire(), timeout=self.admission_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ServiceOverloaded(f"All {self.max_concurrent_turns} turn slots are busy")
+
+    def spawn_turn(self, session: ServiceSession, user_input: str, queue: asyncio.Queue) -> asyncio.Task:
+        """Runs a streamed turn as its own task, referenced until it finishes so it is not garbage-collected."""
+        task = asyncio.create_task(self.run_turn(session, user_input, queue))
+        self._turn_tasks.add(task)
+        task.add_done_callback(self._turn_tasks.discard)
+        return task
+
+    async def run_turn(self, session: ServiceSession, user_input: str, queue: Optional[asyncio.Queue] = None) -> str:
+        """
+        Runs one turn on an admitted slot of a session already marked busy. With `queue`, events
+        are pushed to it for streaming and a failure is reported as an "error" event instead of raised.
+        """
+        session.busy = True
+        self.active_turns += 1
+        if queue is not None:
+            session.agent.output = lambda event, text="": queue.put_nowait((event, text))
+        try:
+            reply = await run_agent_turn(user_input, self.mcp_client, self.groq_client, session.agent, self.groq_tools)
+            if queue is not None:
+                queue.put_nowait(("done", reply))
+            return reply
+        except Exception as e:
+            logger.error(f"Turn failed in session {session.id}: {e}\n{traceback.format_exc()}")
+            if queue is None:
+                raise
+            queue.put_nowait(("error", str(e)))
+            queue.put_nowait(("done", ""))
+            return ""
+        finally:
+            session.agent.output = lambda event, text="": None
+            session.busy = False
+            session.last_used = time.monotonic()
+            self.active_turns -= 1
+            self.turn_slots.release()
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "active_turns": self.active_turns,
+            "max_concurrent_turns": self.max_concurrent_turns,
+            "rejected": self.rejected,
+        }
+
+    async def _evict_idle(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, min(60.0, self.idle_ttl / 2)))
+            now = time.monotonic()
+            idle = [s.id for s in self.sessions.values() if not s.busy and now - s.last_used > self.idle_ttl]
+            for session_id in idle:
+                logger.info(f"Evicting idle session {session_id}")
+                await self.close_session(session_id)
+
+
+service = AgentService(
+    max_sessions         = SERVICE_MAX_SESSIONS,
+    max_concurrent_turns = SERVICE_MAX_CONCURRENT_TURNS,
+    admission_timeout    = SERVICE_ADMISSION_TIMEOUT,
+    idle_ttl             = SESSION_IDLE_TTL
+)
+
+
+# HTTP / SSE API
+def overloaded(e: ServiceOverloaded) -> JSONResponse:
+    return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "1"})
+
+def sse_event(event: str, text: str) -> str:
+    return f"event: {event}\ndata: {json.dumps({'text': text.strip() if event != 'token' else text})}\n\n"
+
+async def create_session(request: Request) -> JSONResponse:
+    body = await request.json() if await request.body() else {}
+    try:
+        session = service.create_session(user_id=body.get("user_id"))
+    except ServiceOverloaded as e:
+        return overloaded(e)
+    return JSONResponse(session.info(), status_code=201)
+
+async def get_session(request: Request) -> JSONResponse:
+    session = service.sessions.get(request.path_params["session_id"])
+    if session is None:
+        return JSONResponse({"error": "Unknown session"}, status_code=404)
+    return JSONResponse(session.info())
+
+async def delete_session(request: Request) -> JSONResponse:
+    if not await service.close_session(request.path_params["session_id"]):
+        return JSONResponse({"error": "Unknown session"}, status_code=404)
+    return JSONResponse({"closed": True})
+
+async def post_message(request: Request):
+    """
+    Runs one turn. Streams Server-Sent Events (status, tool_call, token, ..., done)
+    unless the body sets "stream": false, in which case the reply is returned as JSON.
+    """
+    session = service.sessions.get(request.path_params["session_id"])
+    if session is None:
+        return JSONResponse({"error": "Unknown session"}, status_code=404)
+    body = await request.json()
+    content = str(body.get("content", "")).strip()
+    if not content:
+        return JSONResponse({"error": "content is required"}, status_code=400)
+    if session.busy:
+        return JSONResponse({"error": "A turn is already running in this session"}, status_code=409)
+
+    # Claim the session before waiting for a slot, so a second request is refused rather than queued behind it
+    # (once admitted, run_turn frees it however the turn ends)
+    session.busy = True
+    try:
+        await service.admit()
+    except ServiceOverloaded as e:
+        session.busy = False
+        return overloaded(e)
+    except BaseException:
+        # The client went away while waiting for a slot
+        session.busy = False
+        raise
+
+    if body.get("stream", True) is False:
+        try:
+            reply = await service.run_turn(session, content)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+        return JSONResponse({"reply": reply, "session": session.info()})
+
+    queue: asyncio.Queue = asyncio.Queue()
+    # The turn runs as its own task so a disconnecting client does not cut it short
+    service.spawn_turn(session, content, queue)
+
+    async def events():
+        while True:
+            event, text = await queue.get()
+            yield sse_event(event, text)
+            if event == "done":
+                break
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse(service.health())
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    async with AsyncExitStack() as stack:
+        await service.start(stack)
+        try:
+            yield
+        finally:
+            # Drain sessions (pending episodic saves) while the MCP client is still open
+            await service.stop()
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health, methods=["GET"]),
+        Route("/sessions", create_session, methods=["POST"]),
+        Route("/sessions/{session_id}", get_session, methods=["GET"]),
+        Route("/sessions/{session_id}", delete_session, methods=["DELETE"]),
+        Route("/sessions/{session_id}/messages", post_message, methods=["POST"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    try:
+        validate_config("service")
+        uvicorn.run(app, host=SERVICE_HOST, port=SERVICE_PORT)
+    except KeyboardInterrupt:
+        logger.info("Agent service stopped by user.")
+    except Exception as e:
+        logger.error(f"Agent service error: {e}")
+        logger.debug(traceback.format_exc())
@@ -0,0 +1,138 @@
+# Import necessary libraries and modules
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Tool Result Extraction
+def extract_payload(result: Any) -> Any:
+    """
+    Pulls the structured payload out of a fastmcp `call_tool` result instead of its repr.
+    FastMCP wraps non-object return values as {"result": ...}; that wrapper is removed.
+    """
+    structured = getattr(result, "structured_content", None)
+    if structured is not None:
+        if isinstance(structured, dict) and set(structured) == {"result"}:
+            return structured["result"]
+        return structured
+
+    blocks = getattr(result, "content", result)
+    if not isinstance(blocks, list):
+        return blocks
+
+    texts = [getattr(block, "text", None) for block in blocks]
+    texts = [text for text in texts if text is not None]
+    if not texts:
+        return [str(block) for block in blocks]
+
+    payloads = []
+    for text in texts:
+        try:
+            payloads.append(json.loads(text))
+        except (TypeError, ValueError):
+            payloads.append(text)
+    return payloads[0] if len(payloads) == 1 else payloads
+
+
+# Per-tool Projections
+def _clip(text: Any, limit: int) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+def _memory_list(payload: Any) -> Optional[List[Any]]:
+    if isinstance(payload, dict):
+        payload = payload.get("results", payload.get("memories"))
+    return payload if isinstance(payload, list) else None
+
+def _project_memory(memory: Any) -> Any:
+    if not isinstance(memory, dict):
+        return memory
+    projected = {
+        "id":         memory.get("id"),
+        "memory":     memory.get("memory") or memory.get("text"),
+        "updated_at": memory.get("updated_at") or memory.get("created_at"),
+    }
+    for optional in ("score", "status"):
+        if memory.get(optional) is not None:
+            projected[optional] = memory[optional]
+    return {key: value for key, value in projected.items() if value is not None}
+
+def project_search(payload: Any, top_k: int) -> Any:
+    if not isinstance(payload, dict) or not isinstance(payload.get("results"), list):
+        return payload
+    hits = payload["results"]
+    shaped: Dict[str, Any] = {}
+    if payload.get("answer"):
+        shaped["answer"] = payload["answer"]
+    shaped["results"] = [
+        {"title": hit.get("title"), "url": hit.get("url"), "snippet": _clip(hit.get("content"), 300)}
+        for hit in hits[:top_k] if isinstance(hit, dict)
+    ]
+    if len(hits) > top_k:
+        shaped["truncated"] = f"{len(hits) - top_k} more results omitted; call web_search with a more specific query for other sources."
+    return shaped
+
+def project_memories(payload: Any, limit: int) -> Any:
+    memories = _memory_list(payload)
+    if memories is None:
+        return payload
+    shaped: Dict[str, Any] = {"memories": [_project_memory(m) for m in memories[:limit]]}
+    if isinstance(payload, dict):
+        # Paging info of get_memories, so the model can ask for the next page or only newer memories
+        for key in ("count", "next_page", "as_of"):
+            if payload.get(key) is not None:
+                shaped[key] = payload[key]
+    if len(memories) > limit:
+        shaped["truncated"] = f"{len(memories) - limit} more memories omitted; use a smaller page_size, or search_memories_v2 with a specific query to find them."
+    return shaped
+
+def project_memory(payload: Any) -> Any:
+    return _project_memory(payload)
+
+def project_batch(payload: Any, value_key: str, project: Callable[[Any], Any]) -> Any:
+    """Applies an item projection to each entry of a batch tool result; per-item errors pass through."""
+    if not isinstance(payload, list):
+        return payload
+    return [
+        {**entry, value_key: project(entry[value_key])} if isinstance(entry, dict) and value_key in entry else entry
+        for entry in payload
+    ]
+
+
+# Result Shaping
+class ResultShaper:
+    """
+    Turns raw MCP tool results into compact JSON for the LLM context:
+    per-tool projections first, then hard byte and token caps with a
+    truncation marker telling the model how to fetch more.
+    """
+
+    def __init__(self, max_bytes: int = 4000, max_tokens: int = 1000, search_top_k: int = 5, memory_limit: int = 20):
+        self.max_bytes = min(max_bytes, max_tokens * 4)
+        self.projections: Dict[str, Callable[[Any], Any]] = {
+            "web_search":         lambda p: project_search(p, search_top_k),
+            "get_memories":       lambda p: project_memories(p, memory_limit),
+            "search_memories_v2": lambda p: project_memories(p, memory_limit),
+            "get_memory":         project_memory,
+            "update_memory":      project_memory,
+            "web_search_batch":   lambda p: project_batch(p, "results", lambda r: project_search(r, search_top_k)),
+            "get_memories_batch": lambda p: project_batch(p, "memories", lambda m: project_memories(m, memory_limit)),
+            "get_memory_batch":   lambda p: project_batch(p, "memory", project_memory),
+        }
+
+    def shape(self, tool_name: str, result: Any) -> str:
+        payload = extract_payload(result)
+        if getattr(result, "is_error", False):
+            payload = {"error": payload}
+        elif not (isinstance(payload, dict) and set(payload) == {"error"}):  # a tool's own {"error": ...} result
+            payload = self.projections.get(tool_name, lambda p: p)(payload)
+
+        text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+        return self.truncate(tool_name, text)
+
+    def truncate(self, tool_name: str, text: str) -> str:
+        encoded = text.encode("utf-8")
+        if len(encoded) <= self.max_bytes:
+            return text
+        kept = encoded[:self.max_bytes].decode("utf-8", errors="ignore")
+        omitted = len(encoded) - len(kept.encode("utf-8"))
+        return f"{kept}\n...[truncated {omitted} bytes; call `{tool_name}` with narrower arguments to see more]"
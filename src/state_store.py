@@ -0,0 +1,184 @@
+# Import necessary libraries and modules
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from loguru import logger
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+# Store Interface
+class StateStore(ABC):
+    """
+    State shared by the tool server's workers: a key-value map with optional TTLs
+    and an append-only event log per topic that workers poll (used to broadcast
+    cache invalidations). Calls are synchronous and can block on another worker's
+    write, so the server makes them from a thread when the store is shared.
+    `shared` is False when the store only lives inside one process.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def scan(self, prefix: str) -> List[Any]:
+        """Values of every live key starting with `prefix`."""
+
+    @abstractmethod
+    def publish(self, topic: str, message: Any) -> None:
+        ...
+
+    @abstractmethod
+    def poll(self, topic: str, after: Optional[int]) -> Tuple[int, List[Any]]:
+        """
+        Messages on `topic` newer than sequence number `after`, plus the sequence
+        number to pass next time. With `after=None` only the current position is returned.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryStateStore(StateStore):
+    """Single-process store; the default when the server runs one worker."""
+
+    def __init__(self, retention: float = 600.0):
+        self.retention = retention
+        self._values: Dict[str, Tuple[Optional[float], Any]] = {}
+        self._events: Deque[Tuple[int, float, str, Any]] = deque()
+        self._seq = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._values[key]
+            return None
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._values[key] = (time.time() + ttl if ttl is not None else None, value)
+
+    def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    def scan(self, prefix: str) -> List[Any]:
+        return [value for key in list(self._values) if key.startswith(prefix) for value in [self.get(key)] if value is not None]
+
+    def publish(self, topic: str, message: Any) -> None:
+        now = time.time()
+        self._seq += 1
+        self._events.append((self._seq, now, topic, message))
+        while self._events and self._events[0][1] < now - self.retention:
+            self._events.popleft()
+
+    def poll(self, topic: str, after: Optional[int]) -> Tuple[int, List[Any]]:
+        if after is None or after >= self._seq:
+            return self._seq, []
+        return self._seq, [message for seq, _, event_topic, message in self._events if seq > after and event_topic == topic]
+
+
+class SqliteStateStore(StateStore):
+    """
+    Store in a SQLite file (WAL mode) shared by all workers on one host.
+    Expired keys and events older than `retention` seconds are pruned as new ones are written.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, retention: float = 600.0, prune_every: int = 200):
+        self.path = path
+        self.retention = retention
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, topic TEXT NOT NULL, message TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS events_topic ON events (topic, seq)")
+
+    def _execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _written(self) -> None:
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            now = time.time()
+            self._execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            self._execute("DELETE FROM events WHERE created_at < ?", (now - self.retention,))
+
+    def get(self, key: str) -> Optional[Any]:
+        rows = self._execute("SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time()))
+        return json.loads(rows[0][0]) if rows else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, default=str), time.time() + ttl if ttl is not None else None)
+        )
+        self._written()
+
+    def delete(self, key: str) -> None:
+        self._execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def scan(self, prefix: str) -> List[Any]:
+        rows = self._execute(
+            "SELECT value FROM kv WHERE key >= ? AND key < ? AND (expires_at IS NULL OR expires_at > ?) ORDER BY key",
+            (prefix, prefix + "\uffff", time.time())
+        )
+        return [json.loads(value) for (value,) in rows]
+
+    def publish(self, topic: str, message: Any) -> None:
+        self._execute(
+            "INSERT INTO events (topic, message, created_at) VALUES (?, ?, ?)",
+            (topic, json.dumps(message, default=str), time.time())
+        )
+        self._written()
+
+    def poll(self, topic: str, after: Optional[int]) -> Tuple[int, List[Any]]:
+        if after is None:
+            rows = self._execute("SELECT COALESCE(MAX(seq), 0) FROM events")
+            return rows[0][0], []
+        rows = self._execute("SELECT seq, message FROM events WHERE topic = ? AND seq > ? ORDER BY seq", (topic, after))
+        if not rows:
+            return after, []
+        return rows[-1][0], [json.loads(message) for _, message in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def open_state_store(url: str, retention: float = 600.0) -> StateStore:
+    """`memory` for the in-process store, `sqlite:///path/to/state.db` for the shared SQLite store."""
+    if url == "memory":
+        return InMemoryStateStore(retention=retention)
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        logger.info(f"Using shared state store at {path}")
+        return SqliteStateStore(path, retention=retention)
+    raise ValueError(f"Unsupported STATE_STORE: {url}")
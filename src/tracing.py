@@ -0,0 +1,213 @@
+# Import necessary libraries and modules
+import os
+import sys
+import json
+import time
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from loguru import logger
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# Turn Trace
+class TurnTrace:
+    """Spans recorded during one agent turn; offsets are relative to the start of the turn."""
+
+    def __init__(self, session_id: str, turn: int):
+        self.session_id = session_id
+        self.turn = turn
+        self.started_at = time.time()
+        self.t0 = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+        self.profile: Optional[List[Dict[str, Any]]] = None
+
+    def record(self, name: str, start: float, duration: float, **attrs) -> None:
+        """Adds a span from a `time.perf_counter()` start and a duration in seconds."""
+        span = {"name": name, "start_s": round(start - self.t0, 6), "duration_s": round(duration, 6)}
+        span.update({key: value for key, value in attrs.items() if value is not None})
+        self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Dict[str, Any]]:
+        """Times the enclosed block; attributes can be added to the yielded dict."""
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self.record(name, start, time.perf_counter() - start, **attrs)
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.t0
+
+    def breakdown(self) -> Dict[str, float]:
+        """Total seconds per span name (concurrent tool spans overlap, so they can exceed wall time)."""
+        totals: Dict[str, float] = defaultdict(float)
+        for span in self.spans:
+            totals[span["name"]] += span["duration_s"]
+        return {name: round(total, 6) for name, total in totals.items()}
+
+    def to_record(self) -> Dict[str, Any]:
+        record = {
+            "type": "turn",
+            "session_id": self.session_id,
+            "turn": self.turn,
+            "started_at": self.started_at,
+            "duration_s": round(self.duration or 0.0, 6),
+            "breakdown": self.breakdown(),
+            "spans": self.spans,
+        }
+        if self.profile is not None:
+            record["profile"] = self.profile
+        return record
+
+
+# Sampling Profiler
+class StackSampler:
+    """
+    Samples one thread's Python stack from a background thread at a fixed interval.
+    Turns on the event-loop thread each open a recording; the sampling thread runs while
+    any recording is open and adds every sample to all of them, so concurrent turns
+    share one sampler and each gets the stacks taken while it was running.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005, max_depth: int = 30):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self._recordings: List[Counter] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self) -> Counter:
+        """Starts a recording; samples are counted in the returned collapsed-stack Counter."""
+        samples: Counter = Counter()
+        with self._lock:
+            self._recordings.append(samples)
+            if self._thread is None:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,), name="memoria-stack-sampler", daemon=True)
+                self._thread.start()
+        return samples
+
+    def close(self, samples: Counter) -> None:
+        """Ends a recording, and the sampling thread with the last one."""
+        with self._lock:
+            self._recordings = [recording for recording in self._recordings if recording is not samples]
+            if self._recordings or self._thread is None:
+                return
+            thread, self._thread = self._thread, None
+            self._stop.set()
+        thread.join()
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None and len(frames) < self.max_depth:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if frames:
+                # Collapsed-stack format (root first), as consumed by flamegraph tools
+                stack = ";".join(reversed(frames))
+                with self._lock:
+                    for samples in self._recordings:
+                        samples[stack] += 1
+
+def top_stacks(samples: Counter, limit: int = 20) -> List[Dict[str, Any]]:
+    total = sum(samples.values()) or 1
+    return [
+        {"stack": stack, "samples": count, "share": round(count / total, 4)}
+        for stack, count in samples.most_common(limit)
+    ]
+
+# One sampler per sampled thread for the whole process
+stack_samplers: Dict[int, StackSampler] = {}
+stack_samplers_lock = threading.Lock()
+
+def shared_sampler(thread_id: int, interval: float) -> StackSampler:
+    """The process-wide sampler of `thread_id`; the first caller's interval applies."""
+    with stack_samplers_lock:
+        sampler = stack_samplers.get(thread_id)
+        if sampler is None:
+            sampler = stack_samplers[thread_id] = StackSampler(thread_id, interval)
+        return sampler
+
+
+# Session Tracer
+class SessionTracer:
+    """
+    Collects per-turn traces for one conversation and appends them as JSONL to `path`,
+    followed by a session summary record on `close()`. With `slow_turn_s` set, each
+    turn records from the event-loop thread's shared StackSampler and hot stacks are
+    attached to turns slower than the threshold.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        path: Optional[str] = None,
+        slow_turn_s: Optional[float] = None,
+        sample_interval: float = 0.005
+    ):
+        self.session_id = session_id
+        self.path = path
+        self.slow_turn_s = slow_turn_s
+        self.sample_interval = sample_interval
+        self.turns: List[TurnTrace] = []
+        self._sampler: Optional[StackSampler] = None
+        self._samples: Optional[Counter] = None
+
+    def start_turn(self) -> TurnTrace:
+        trace = TurnTrace(self.session_id, len(self.turns) + 1)
+        if self.slow_turn_s is not None:
+            self._sampler = shared_sampler(threading.get_ident(), self.sample_interval)
+            self._samples = self._sampler.open()
+        return trace
+
+    def end_turn(self, trace: TurnTrace) -> None:
+        trace.finish()
+        if self._sampler is not None:
+            self._sampler.close(self._samples)
+            if trace.duration >= self.slow_turn_s:
+                trace.profile = top_stacks(self._samples)
+                logger.warning(f"Slow turn {trace.turn} ({trace.duration:.2f}s); hottest stack: {trace.profile[0]['stack'] if trace.profile else 'n/a'}")
+            self._sampler = self._samples = None
+
+        self.turns.append(trace)
+        logger.debug(f"Turn {trace.turn} took {trace.duration:.3f}s: {trace.breakdown()}")
+        self._write(trace.to_record())
+
+    def summary(self) -> Dict[str, Any]:
+        durations = sorted(trace.duration or 0.0 for trace in self.turns)
+        totals: Dict[str, float] = defaultdict(float)
+        counts: Dict[str, int] = defaultdict(int)
+        for trace in self.turns:
+            for span in trace.spans:
+                totals[span["name"]] += span["duration_s"]
+                counts[span["name"]] += 1
+        return {
+            "type": "session",
+            "session_id": self.session_id,
+            "turns": len(durations),
+            "total_s": round(sum(durations), 6),
+            "turn_p50_s": round(durations[len(durations) // 2], 6) if durations else None,
+            "turn_max_s": round(durations[-1], 6) if durations else None,
+            "spans": {name: {"count": counts[name], "total_s": round(totals[name], 6)} for name in totals},
+        }
+
+    def close(self) -> None:
+        if self.turns:
+            self._write(self.summary())
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write trace to {self.path}: {e}")
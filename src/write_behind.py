@@ -0,0 +1,167 @@
+# Import necessary libraries and modules
+import time
+import uuid
+import asyncio
+from loguru import logger
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+BatchKey = Tuple[Tuple[str, Any], ...]
+
+
+class MemoryWriteQueue:
+    """
+    Write-behind pipeline for mem0 `add` calls.
+
+    Writes are acknowledged as soon as they are queued. Writes with identical
+    `add` arguments (user_id, run_id, agent_id, ...) are coalesced into one
+    batch whose messages are sent in a single call, either when the batch
+    reaches `batch_size` messages or on the next `flush_interval` tick.
+    Queued messages are bounded by `max_pending`; producers wait for space.
+    Each write gets an id, and `on_flushed` receives the ids a flush covered and
+    whether it succeeded. Backends such as mem0 index an acknowledged `add` in the
+    background, so `pending_for` keeps reporting a flushed batch for `settle_time`
+    seconds until reads can be expected to return it.
+    """
+
+    def __init__(
+        self,
+        add_fn: Callable[..., Awaitable[Any]],
+        batch_size: int = 20,
+        flush_interval: float = 2.0,
+        max_pending: int = 1000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        settle_time: float = 0.0,
+        on_flushed: Optional[Callable[[Dict[str, Any], List[str], bool], None]] = None
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.settle_time = settle_time
+        self.flushed = 0
+        self.dropped = 0
+        self._add = add_fn
+        self._on_flushed = on_flushed
+        self._batches: Dict[BatchKey, List[Dict[str, str]]] = {}
+        self._write_ids: Dict[BatchKey, List[str]] = {}
+        self._flushing: List[Tuple[Dict[str, Any], List[Dict[str, str]]]] = []
+        self._settling: List[Tuple[float, Dict[str, Any], List[Dict[str, str]]]] = []
+        self._pending = 0
+        self._space = asyncio.Condition()
+        self._tasks: Set[asyncio.Task] = set()
+        self._ticker: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Messages queued or being flushed."""
+        return self._pending
+
+    async def enqueue(self, messages: List[Dict[str, str]], **add_kwargs) -> Optional[str]:
+        """
+        Queues messages for a later `add_fn(messages=..., **add_kwargs)` call and returns
+        the write's id (None once draining, when the write is performed inline).
+        """
+        if self._closed:
+            await self._add(messages=messages, **add_kwargs)
+            return None
+        self._ensure_ticker()
+        write_id = uuid.uuid4().hex
+
+        async with self._space:
+            # Backpressure: wait for room, but never block a single oversized write forever
+            await self._space.wait_for(
+                lambda: self._closed or self._pending == 0 or self._pending + len(messages) <= self.max_pending
+            )
+            if not self._closed:
+                key: BatchKey = tuple(sorted(add_kwargs.items()))
+                batch = self._batches.setdefault(key, [])
+                batch.extend(messages)
+                self._write_ids.setdefault(key, []).append(write_id)
+                self._pending += len(messages)
+
+        if self._closed:
+            # Draining began while this write waited for room; nothing will flush it now
+            await self._add(messages=messages, **add_kwargs)
+            return None
+        if len(batch) >= self.batch_size:
+            self._spawn_flush(key)
+        return write_id
+
+    def pending_for(self, user_id: str) -> List[Tuple[Dict[str, Any], List[Dict[str, str]]]]:
+        """(add kwargs, messages) of every unflushed or still settling batch for `user_id`, for read-your-writes."""
+        now = time.monotonic()
+        self._settling = [entry for entry in self._settling if entry[0] > now]
+        queued = [(dict(key), batch) for key, batch in self._batches.items()]
+        settling = [(kwargs, batch) for _, kwargs, batch in self._settling]
+        return [(kwargs, batch) for kwargs, batch in queued + self._flushing + settling if kwargs.get("user_id") == user_id]
+
+    async def drain(self) -> None:
+        """Stops the interval ticker and flushes everything still queued."""
+        self._closed = True
+        async with self._space:
+            # Writes waiting for room are performed inline instead
+            self._space.notify_all()
+        if self._ticker:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+
+        for key in list(self._batches):
+            self._spawn_flush(key)
+        if self._tasks:
+            logger.info(f"Draining {self._pending} queued memory messages...")
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _ensure_ticker(self) -> None:
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.create_task(self._tick())
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            for key in list(self._batches):
+                self._spawn_flush(key)
+
+    def _spawn_flush(self, key: BatchKey) -> None:
+        batch = self._batches.pop(key, None)
+        write_ids = self._write_ids.pop(key, [])
+        if not batch:
+            return
+        task = asyncio.create_task(self._flush(dict(key), batch, write_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, add_kwargs: Dict[str, Any], batch: List[Dict[str, str]], write_ids: List[str]) -> None:
+        entry = (add_kwargs, batch)
+        self._flushing.append(entry)
+        ok = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await self._add(messages=batch, **add_kwargs)
+                    self.flushed += len(batch)
+                    ok = True
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self.dropped += len(batch)
+                        logger.error(f"Dropping {len(batch)} memory messages for {add_kwargs} after {attempt + 1} attempts: {e}")
+                    else:
+                        delay = self.retry_backoff * 2 ** attempt
+                        logger.warning(f"Memory flush failed ({e}); retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+            if ok and self.settle_time > 0:
+                self._settling.append((time.monotonic() + self.settle_time, add_kwargs, batch))
+            if self._on_flushed:
+                self._on_flushed(add_kwargs, write_ids, ok)
+        finally:
+            self._flushing.remove(entry)
+            async with self._space:
+                self._pending -= len(batch)
+                self._space.notify_all()
@@ -0,0 +1,9 @@
+# Import necessary libraries and modules
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The tool server validates its settings on import; run it against the in-process backend
+os.environ.setdefault("MEMORY_BACKEND", "local")
+os.environ.setdefault("LOCAL_MEMORY_PATH", "")
+os.environ.setdefault("TAVILY_API_KEY", "test")
@@ -0,0 +1,123 @@
+# Import necessary libraries and modules
+import json
+import asyncio
+
+from src.cache import TTLCache, SearchCache, SingleFlight, normalize_query
+
+
+# TTLCache
+def test_get_returns_value_and_counts_hits_and_misses():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_expired_entry_is_a_miss_and_is_removed():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1, ttl=0)
+
+    assert cache.get("a", "default") == "default"
+    assert len(cache) == 0
+    assert cache.misses == 1
+
+def test_evicts_least_recently_used_entry():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_invalidate_tag_drops_every_tagged_entry():
+    cache = TTLCache(maxsize=8, ttl=60)
+    cache.set(("memories", "alice", 1), ["m1"], tags=["user:alice"])
+    cache.set(("memory", "m1"), "m1", tags=["user:alice", "memory:m1"])
+    cache.set(("memories", "bob", 1), ["m2"], tags=["user:bob"])
+
+    assert cache.invalidate_tag("user:alice") == 2
+    assert cache.get(("memory", "m1")) is None
+    assert cache.get(("memories", "bob", 1)) == ["m2"]
+    assert cache.invalidate_tag("memory:m1") == 0
+
+def test_overwriting_an_entry_replaces_its_tags():
+    cache = TTLCache(maxsize=8, ttl=60)
+    cache.set("a", 1, tags=["old"])
+    cache.set("a", 2, tags=["new"])
+
+    cache.invalidate_tag("old")
+    assert cache.get("a") == 2
+    cache.invalidate_tag("new")
+    assert cache.get("a") is None
+
+
+# SearchCache
+def test_normalize_query_ignores_case_punctuation_and_whitespace():
+    assert normalize_query("  What's the  WEATHER in Paris? ") == normalize_query("what s the weather in paris")
+
+def test_normalize_query_keeps_plus_and_hash():
+    keys = {normalize_query(f"{language} tutorial") for language in ("C++", "C#", "C")}
+
+    assert keys == {"c++ tutorial", "c# tutorial", "c tutorial"}
+    assert normalize_query("C++?") == normalize_query("c++")
+
+def test_search_cache_evicts_oldest_entries_over_byte_budget():
+    value = {"results": ["x" * 40]}
+    size = len(json.dumps(value))
+    cache = SearchCache(max_bytes=2 * size, ttl=60)
+    cache.set("a", value)
+    cache.set("b", value)
+    cache.set("c", value)
+
+    assert cache.get("a") is None
+    assert cache.get("c") == value
+    assert cache.total_bytes == 2 * size
+    assert cache.evictions == 1
+
+def test_search_cache_skips_values_larger_than_budget():
+    cache = SearchCache(max_bytes=10, ttl=60)
+    cache.set("a", "x" * 100)
+
+    assert len(cache) == 0
+
+def test_search_cache_persists_unexpired_entries(tmp_path):
+    path = str(tmp_path / "cache" / "search.json")
+    cache = SearchCache(ttl=60, path=path)
+    cache.set("fresh", {"answer": 1})
+    cache.ttl = 0
+    cache.set("stale", {"answer": 2})
+    cache.save()
+
+    restored = SearchCache(ttl=60, path=path)
+    assert restored.get("fresh") == {"answer": 1}
+    assert restored.get("stale") is None
+    assert [p.name for p in (tmp_path / "cache").iterdir()] == ["search.json"]
+
+def test_search_cache_ignores_unreadable_file(tmp_path):
+    path = tmp_path / "search.json"
+    path.write_text("not json")
+
+    assert len(SearchCache(path=str(path))) == 0
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("q", fetch) for _ in range(3)))
+        return flight, results
+
+    flight, results = asyncio.run(main())
+    assert results == [1, 1, 1]
+    assert flight.coalesced == 2
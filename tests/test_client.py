@@ -0,0 +1,92 @@
+# Import necessary libraries and modules
+import asyncio
+from types import SimpleNamespace
+
+from src.client import StreamedToolCall, stream_completion
+
+
+def tool_delta(index, id=None, name=None, arguments=None):
+    function = SimpleNamespace(name=name, arguments=arguments) if name or arguments else None
+    return SimpleNamespace(index=index, id=id, function=function)
+
+def chunk(content=None, tool_calls=None):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls))])
+
+class FakeGroq:
+    """Replays chunks as a completion stream, counting how many have been consumed."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        async def stream():
+            for item in self.chunks:
+                self.sent += 1
+                yield item
+        return stream()
+
+def run_stream(groq):
+    dispatched = []
+    events = []
+    on_tool_call = lambda call: dispatched.append((call.function.name, call.function.arguments, groq.sent))
+    response = asyncio.run(stream_completion(groq, [], [], on_tool_call, output=lambda event, text="": events.append((event, text))))
+    return response, dispatched, events
+
+
+# Delta Reassembly
+def test_call_is_complete_once_arguments_parse():
+    call = StreamedToolCall(0)
+    call.id = "call_1"
+    call.function.name = "web_search"
+    call.function.arguments = '{"query": "a}'
+    assert not call.is_complete()
+    call.function.arguments += '"}'
+    assert call.is_complete()
+    call.id = ""
+    assert not call.is_complete()
+
+def test_message_defaults_to_empty_arguments():
+    call = StreamedToolCall(0)
+    call.id = "call_1"
+    call.function.name = "get_memories"
+
+    assert call.to_message() == {"id": "call_1", "type": "function", "function": {"name": "get_memories", "arguments": "{}"}}
+
+
+# Dispatch
+def test_calls_are_dispatched_as_soon_as_their_arguments_complete():
+    groq = FakeGroq([
+        chunk(tool_calls=[tool_delta(0, id="call_1", name="web_search", arguments='{"query": ')]),
+        chunk(tool_calls=[tool_delta(0, arguments='"news"}')]),
+        chunk(tool_calls=[tool_delta(1, id="call_2", name="get_memories", arguments='{"user_id"')]),
+        chunk(tool_calls=[tool_delta(1, arguments=': "alice"}')]),
+    ])
+    response, dispatched, events = run_stream(groq)
+
+    assert dispatched == [
+        ("web_search", '{"query": "news"}', 2),
+        ("get_memories", '{"user_id": "alice"}', 4),
+    ]
+    assert [call.id for call in response.tool_calls] == ["call_1", "call_2"]
+    assert response.content is None
+    assert events == []
+
+def test_unfinished_calls_are_dispatched_by_the_next_index_or_the_end_of_stream():
+    groq = FakeGroq([
+        chunk(tool_calls=[tool_delta(0, id="call_1", name="web_search", arguments='{"query": "a"')]),
+        chunk(tool_calls=[tool_delta(1, id="call_2", name="web_search", arguments='{"query"')]),
+        chunk(tool_calls=[tool_delta(1, arguments=': "b"')]),
+    ])
+    _, dispatched, _ = run_stream(groq)
+
+    assert [(name, sent) for name, _, sent in dispatched] == [("web_search", 2), ("web_search", 3)]
+
+def test_raw_tool_call_text_is_not_printed():
+    raw, _, raw_events = run_stream(FakeGroq([chunk("<func"), chunk('tion=web_search>{"query": "a"}</function>')]))
+    answer, _, answer_events = run_stream(FakeGroq([chunk("Hel"), chunk("lo")]))
+
+    assert raw.content.startswith("<function=") and not raw.streamed and raw_events == []
+    assert answer.streamed
+    assert answer_events == [("answer_start", ""), ("token", "Hel"), ("token", "lo"), ("answer_end", "")]
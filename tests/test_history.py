@@ -0,0 +1,73 @@
+# Import necessary libraries and modules
+from src.history import ConversationHistory, estimate_tokens
+
+
+def add_turn(history, user_text, answer, tool=None):
+    history.begin_turn(user_text)
+    if tool:
+        history.append({
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{"id": "call_1", "type": "function", "function": {"name": tool, "arguments": "{}"}}],
+        })
+        history.append({"role": "tool", "tool_call_id": "call_1", "content": "result " * 20})
+    history.append({"role": "assistant", "content": answer})
+
+
+def test_token_count_tracks_messages():
+    history = ConversationHistory("You are helpful.", token_budget=10_000)
+    add_turn(history, "hello", "hi there", tool="web_search")
+
+    assert history.token_count == sum(estimate_tokens(message) for message in history)
+    assert history.compacted_turns == 0
+
+def test_oldest_turns_are_compacted_to_fit_the_budget():
+    history = ConversationHistory("You are helpful.", token_budget=400, summary_max_tokens=100)
+    for i in range(12):
+        add_turn(history, f"question {i} " + "x" * 100, f"answer {i}")
+
+    assert history.compacted_turns > 0
+    assert history.token_count <= history.token_budget
+    assert history.token_count == sum(estimate_tokens(message) for message in history)
+    assert history[0] == {"role": "system", "content": "You are helpful."}
+    assert history[1]["content"].startswith(f"Summary of {history.compacted_turns} earlier turn(s)")
+    assert history[-2:] == [
+        {"role": "user", "content": "question 11 " + "x" * 100},
+        {"role": "assistant", "content": "answer 11"},
+    ]
+
+def test_summary_line_records_question_tools_and_answer():
+    history = ConversationHistory("You are helpful.", token_budget=150, memory_hint="Older details are in memory.")
+    add_turn(history, "what do you remember about me?", "You like tea.", tool="get_memories")
+    add_turn(history, "thanks " + "x" * 400, "welcome")
+
+    assert history.compacted_turns == 1
+    assert history[1]["content"].splitlines() == [
+        "Summary of 1 earlier turn(s) of this conversation, compacted to save context. Older details are in memory.",
+        "- User: what do you remember about me? | Tools: get_memories | Assistant: You like tea.",
+    ]
+
+def test_current_turn_is_never_compacted():
+    history = ConversationHistory("You are helpful.", token_budget=100)
+    add_turn(history, "first", "done")
+    history.begin_turn("second " + "y" * 1000)
+    history.append({
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [{"id": "call_1", "type": "function", "function": {"name": "web_search", "arguments": "{}"}}],
+    })
+    history.append({"role": "tool", "tool_call_id": "call_1", "content": "z" * 1000})
+
+    # Over budget, but only the current turn is left to compact
+    assert history.token_count > history.token_budget
+    assert history.compacted_turns == 1
+    assert [message["role"] for message in history] == ["system", "system", "user", "assistant", "tool"]
+
+def test_summary_stays_within_its_token_cap():
+    history = ConversationHistory("You are helpful.", token_budget=200, summary_max_tokens=60)
+    for i in range(20):
+        add_turn(history, f"question {i} " + "x" * 150, f"answer {i}")
+
+    summary_lines = history[1]["content"].splitlines()[1:]
+    assert sum(len(line) for line in summary_lines) // 4 <= 60
+    assert "question 18" in summary_lines[-1]
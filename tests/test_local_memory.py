@@ -0,0 +1,105 @@
+# Import necessary libraries and modules
+import asyncio
+
+from src.local_memory import LocalVectorBackend
+from src.memory_backends import match_filter
+
+
+def texts(records):
+    return sorted(record["memory"] for record in records)
+
+
+def seeded_backend(path=None):
+    backend = LocalVectorBackend(path=path, dim=64)
+
+    async def seed():
+        await backend.add([{"role": "user", "content": "alice likes green tea"}], user_id="alice", metadata={"topic": "drinks", "priority": 3})
+        await backend.add([{"role": "user", "content": "alice lives in Paris"}], user_id="alice", run_id="r1", metadata={"topic": "places", "priority": 1})
+        await backend.add([{"role": "assistant", "content": "bob prefers coffee"}], user_id="bob", agent_id="agent", metadata={"topic": "drinks", "priority": 2})
+
+    asyncio.run(seed())
+    return backend
+
+
+def test_match_filter_operators():
+    record = {"user_id": "alice", "metadata": {"priority": 3, "tags": ["a", "b"]}, "memory": "Green tea"}
+
+    assert match_filter(record, {"user_id": "alice"})
+    assert match_filter(record, {"priority": {"gte": 2, "lt": 4}})
+    assert match_filter(record, {"user_id": {"in": ["alice", "bob"]}})
+    assert match_filter(record, {"user_id": {"ne": "bob"}})
+    assert match_filter(record, {"tags": "a"})
+    assert match_filter(record, {"memory": {"icontains": "green"}})
+    assert match_filter(record, {"user_id": "*"})
+    assert not match_filter(record, {"run_id": "*"})
+    assert match_filter(record, {"OR": [{"user_id": "bob"}, {"priority": 3}]})
+    assert not match_filter(record, {"NOT": [{"user_id": "alice"}]})
+    assert match_filter(record, {"AND": [{"user_id": "alice"}, {"metadata": {"priority": 3}}]})
+
+def test_get_all_scopes_by_indexed_fields():
+    backend = seeded_backend()
+
+    async def main():
+        return (
+            await backend.get_all(filters={"user_id": "alice"}),
+            await backend.get_all(filters={"AND": [{"user_id": "alice"}, {"run_id": "r1"}]}),
+            await backend.get_all(filters={"agent_id": "agent"}),
+            await backend.get_all(filters={"user_id": "carol"}),
+        )
+
+    alice, alice_run, agent, carol = asyncio.run(main())
+    assert texts(alice) == ["alice likes green tea", "alice lives in Paris"]
+    assert texts(alice_run) == ["alice lives in Paris"]
+    assert texts(agent) == ["bob prefers coffee"]
+    assert carol == []
+
+def test_get_all_combines_index_and_metadata_filters():
+    backend = seeded_backend()
+
+    async def main():
+        return (
+            await backend.get_all(filters={"OR": [{"user_id": "bob"}, {"topic": "places"}]}),
+            await backend.get_all(filters={"AND": [{"topic": "drinks"}, {"priority": {"gt": 2}}]}),
+            await backend.get_all(filters={"AND": [{"user_id": {"in": ["alice", "bob"]}}, {"NOT": [{"topic": "drinks"}]}]}),
+        )
+
+    either, high_priority_drinks, not_drinks = asyncio.run(main())
+    assert texts(either) == ["alice lives in Paris", "bob prefers coffee"]
+    assert texts(high_priority_drinks) == ["alice likes green tea"]
+    assert texts(not_drinks) == ["alice lives in Paris"]
+
+def test_search_respects_filters_and_ranks_by_similarity():
+    backend = seeded_backend()
+
+    async def main():
+        return (
+            await backend.search("green tea", filters={"user_id": "alice"}),
+            await backend.search("green tea", filters={"user_id": "bob"}),
+        )
+
+    alice, bob = asyncio.run(main())
+    assert alice[0]["memory"] == "alice likes green tea"
+    assert alice[0]["score"] >= alice[-1]["score"]
+    assert texts(bob) == ["bob prefers coffee"]
+
+def test_deleted_and_updated_records_are_filtered_correctly(tmp_path):
+    backend = seeded_backend(str(tmp_path))
+
+    async def main():
+        paris = (await backend.get_all(filters={"run_id": "r1"}))[0]
+        await backend.update(paris["id"], metadata={"topic": "drinks"})
+        tea = next(r for r in await backend.get_all(filters={"user_id": "alice"}) if "tea" in r["memory"])
+        await backend.delete(tea["id"])
+        await backend.close()
+
+        reopened = LocalVectorBackend(path=str(tmp_path), dim=64)
+        return await reopened.get_all(filters={"AND": [{"user_id": "alice"}, {"topic": "drinks"}]})
+
+    assert texts(asyncio.run(main())) == ["alice lives in Paris"]
+
+def test_get_all_pages_matching_rows():
+    backend = seeded_backend()
+
+    page = asyncio.run(backend.get_all(filters={"user_id": {"in": ["alice", "bob"]}}, page=2, page_size=2))
+    assert page["count"] == 3
+    assert len(page["results"]) == 1
@@ -0,0 +1,72 @@
+# Import necessary libraries and modules
+import asyncio
+import inspect
+
+import src.server as server
+from src.prefetch import TOOL_ARG_DEFAULTS, ToolPrefetcher
+
+
+def prefetch(prefetcher, tool_name, tool_args, call):
+    prefetcher.start(tool_name, tool_args, call, asyncio.ensure_future)
+
+
+# Keys
+def test_spelled_out_defaults_match_omitted_ones():
+    omitted = ToolPrefetcher.key("get_memories", {"user_id": "alice"})
+
+    assert ToolPrefetcher.key("get_memories", {"user_id": "alice", "page": 1}) == omitted
+    assert ToolPrefetcher.key("get_memories", {"page_size": server.MEMORY_PAGE_SIZE, "user_id": "alice", "fields": None}) == omitted
+    assert ToolPrefetcher.key("get_memories", {"user_id": "alice", "page": 2}) != omitted
+    assert ToolPrefetcher.key("get_memories", {"user_id": "bob"}) != omitted
+
+def test_defaults_match_the_server_tools():
+    for tool_name, defaults in TOOL_ARG_DEFAULTS.items():
+        parameters = inspect.signature(getattr(server, tool_name)).parameters
+        assert defaults == {
+            name: parameter.default for name, parameter in parameters.items()
+            if parameter.default is not inspect.Parameter.empty
+        }
+
+
+# Prefetched Calls
+def test_matching_call_takes_the_prefetched_result_once():
+    prefetcher = ToolPrefetcher()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"results": []}
+
+    async def main():
+        prefetch(prefetcher, "get_memories", {"user_id": "alice"}, fetch)
+        prefetch(prefetcher, "get_memories", {"user_id": "alice", "page": 1}, fetch)
+        return (
+            await prefetcher.take("get_memories", {"user_id": "bob"}),
+            await prefetcher.take("get_memories", {"user_id": "alice", "page": 1}),
+            await prefetcher.take("get_memories", {"user_id": "alice"}),
+        )
+
+    other, hit, again = asyncio.run(main())
+    assert other == (None, False)
+    assert hit == ({"results": []}, True)
+    assert again == (None, False)
+    assert (prefetcher.issued, prefetcher.hits, len(calls)) == (1, 1, 1)
+
+def test_failed_or_invalidated_prefetches_are_misses():
+    prefetcher = ToolPrefetcher()
+
+    async def fail():
+        raise ConnectionError("down")
+
+    async def fetch():
+        return "memories"
+
+    async def main():
+        prefetch(prefetcher, "get_memories", {"user_id": "alice"}, fail)
+        failed = await prefetcher.take("get_memories", {"user_id": "alice"})
+        prefetch(prefetcher, "get_memories", {"user_id": "alice"}, fetch)
+        prefetcher.invalidate()
+        return failed, await prefetcher.take("get_memories", {"user_id": "alice"})
+
+    assert asyncio.run(main()) == ((None, False), (None, False))
+    assert prefetcher.hits == 0
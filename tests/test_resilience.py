@@ -0,0 +1,131 @@
+# Import necessary libraries and modules
+import asyncio
+
+import httpx
+import pytest
+
+from src.resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy, is_transient
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class Flaky:
+    """Async callable that raises the queued errors in order, then returns "ok"."""
+
+    def __init__(self, *errors, delay: float = 0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def policy(**kwargs):
+    events = []
+    kwargs.setdefault("base_delay", 0)
+    return ResiliencePolicy("backend", on_event=lambda event, operation: events.append(event), **kwargs), events
+
+
+def test_is_transient_classifies_failures():
+    assert is_transient(asyncio.TimeoutError())
+    assert is_transient(httpx.ConnectError("refused"))
+    assert is_transient(StatusError(503))
+    assert is_transient(StatusError(429))
+    assert not is_transient(StatusError(400))
+    assert not is_transient(StatusError(409))
+    assert not is_transient(ValueError("bad input"))
+
+def test_idempotent_call_is_retried_on_transient_errors():
+    pol, events = policy(retries=2)
+    fn = Flaky(StatusError(503), ConnectionError())
+
+    assert asyncio.run(pol.call(fn, "search", idempotent=True)) == "ok"
+    assert fn.calls == 3
+    assert events == ["retry", "retry"]
+
+def test_non_idempotent_call_is_not_retried():
+    pol, events = policy(retries=2)
+    fn = Flaky(StatusError(503))
+
+    with pytest.raises(StatusError):
+        asyncio.run(pol.call(fn, "add"))
+    assert fn.calls == 1
+    assert events == []
+
+def test_permanent_error_is_not_retried():
+    pol, _ = policy(retries=2)
+    fn = Flaky(StatusError(404))
+
+    with pytest.raises(StatusError):
+        asyncio.run(pol.call(fn, "get", idempotent=True))
+    assert fn.calls == 1
+
+def test_breaker_opens_after_threshold_and_rejects_calls():
+    pol, events = policy(retries=0, failure_threshold=2, reset_timeout=60)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            asyncio.run(pol.call(Flaky(ConnectionError()), "search"))
+    fn = Flaky()
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(pol.call(fn, "search"))
+    assert fn.calls == 0
+    assert events == ["rejected"]
+
+def test_answered_request_resets_the_failure_streak():
+    breaker = CircuitBreaker("backend", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(ConnectionError())
+    breaker.record_failure(StatusError(404))
+    breaker.record_failure(ConnectionError())
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 1
+
+def test_half_open_breaker_closes_after_successful_probe():
+    breaker = CircuitBreaker("backend", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure(ConnectionError())
+    assert breaker.state == CircuitBreaker.OPEN
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker("backend", failure_threshold=5, reset_timeout=0)
+    for _ in range(5):
+        breaker.record_failure(ConnectionError())
+    breaker.before_call()
+    breaker.record_failure(ConnectionError())
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_slow_read_is_hedged_and_fastest_attempt_wins():
+    pol, events = policy(hedge=True, hedge_quantile=0.5, hedge_min_samples=3)
+
+    async def main():
+        for _ in range(3):
+            await pol.call(Flaky(delay=0.01), "search", idempotent=True)
+        attempts = 0
+
+        async def slow_then_fast():
+            nonlocal attempts
+            attempt, attempts = attempts, attempts + 1
+            await asyncio.sleep(0.5 if attempt == 0 else 0.01)
+            return attempt
+
+        return await pol.call(slow_then_fast, "search", idempotent=True)
+
+    assert asyncio.run(main()) == 1
+    assert events == ["hedge"]
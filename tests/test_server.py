@@ -0,0 +1,122 @@
+# Import necessary libraries and modules
+import asyncio
+
+import pytest
+
+import src.server as server
+from src.local_memory import LocalVectorBackend
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = LocalVectorBackend(dim=64)
+    monkeypatch.setattr(server.memory_backend, "_client", backend)
+    server.memory_cache.clear()
+    yield backend
+    server.memory_cache.clear()
+
+def seed(backend, user_id, *texts):
+    async def add():
+        for text in texts:
+            await backend.add([{"role": "user", "content": text}], user_id=user_id)
+
+    asyncio.run(add())
+
+
+# Cache Invalidation
+def test_delete_refreshes_every_cached_page(backend):
+    seed(backend, "alice", "first fact", "second fact")
+
+    async def main():
+        first = await server.get_memories("alice", page=1, page_size=1)
+        await server.get_memories("alice", page=2, page_size=1)
+        await server.delete_memory(first["results"][0]["id"])
+        return (
+            await server.get_memories("alice", page=1, page_size=1),
+            await server.get_memories("alice", page=2, page_size=1),
+        )
+
+    page_1, page_2 = asyncio.run(main())
+    assert page_1["count"] == page_2["count"] == 1
+    assert page_1["next_page"] is None
+    assert page_2["results"] == []
+
+def test_update_shows_up_in_updated_since_reads(backend):
+    seed(backend, "alice", "first fact", "second fact")
+
+    async def main():
+        page = await server.get_memories("alice")
+        assert (await server.get_memories("alice", updated_since=page["as_of"]))["results"] == []
+        await asyncio.sleep(0.001)
+        await server.update_memory(page["results"][0]["id"], text="first fact, revised")
+        return (
+            await server.get_memories("alice", updated_since=page["as_of"]),
+            await server.get_memories("alice"),
+        )
+
+    changed, everything = asyncio.run(main())
+    assert [m["memory"] for m in changed["results"]] == ["first fact, revised"]
+    assert sorted(m["memory"] for m in everything["results"]) == ["first fact, revised", "second fact"]
+
+def test_writes_leave_other_users_pages_cached(backend):
+    seed(backend, "alice", "alice fact")
+    seed(backend, "bob", "bob fact")
+
+    async def main():
+        alice = await server.get_memories("alice")
+        await server.get_memories("bob")
+        await server.delete_memory(alice["results"][0]["id"])
+        hits = server.memory_cache.hits
+        await server.get_memories("bob")
+        return server.memory_cache.hits - hits
+
+    assert asyncio.run(main()) == 1
+
+
+# Tool Errors
+def errors(tool):
+    return server.tool_errors_total._values.get((tool,), 0)
+
+def test_error_results_are_counted_as_tool_errors(backend):
+    seed(backend, "alice", "alice fact")
+    before = errors("get_memory"), errors("get_memories")
+
+    async def main():
+        return (
+            await server.get_memory("missing"),
+            await server.get_memories(""),
+            await server.get_memories("alice"),
+        )
+
+    missing, invalid, page = asyncio.run(main())
+    assert set(missing) == set(invalid) == {"error"}
+    assert page["count"] == 1
+    assert (errors("get_memory"), errors("get_memories")) == (before[0] + 1, before[1] + 1)
+
+
+# Paging and Field Selection
+def test_memory_page_uses_the_backend_count():
+    page = server.memory_page({"count": 5, "results": [{"id": "m3"}, {"id": "m4"}]}, page=2, page_size=2)
+
+    assert page == {"count": 5, "page": 2, "page_size": 2, "results": [{"id": "m3"}, {"id": "m4"}], "next_page": 3}
+    assert server.memory_page({"count": 4, "results": [{"id": "m3"}, {"id": "m4"}]}, page=2, page_size=2)["next_page"] is None
+
+def test_memory_page_slices_a_bare_list():
+    memories = [{"id": f"m{i}"} for i in range(5)]
+
+    assert server.memory_page(memories, page=3, page_size=2) == {
+        "count": 5, "page": 3, "page_size": 2, "results": [{"id": "m4"}], "next_page": None,
+    }
+    assert server.memory_page(memories, page=4, page_size=2)["results"] == []
+
+def test_memory_page_without_a_count_guesses_from_a_full_page():
+    assert server.memory_page({"results": [{"id": "m1"}, {"id": "m2"}]}, page=1, page_size=2)["next_page"] == 2
+    assert server.memory_page({"results": [{"id": "m1"}]}, page=1, page_size=2)["next_page"] is None
+    assert server.memory_page("unexpected", page=1, page_size=2)["results"] == []
+
+def test_select_fields_always_keeps_the_id():
+    page = {"count": 1, "results": [{"id": "m1", "memory": "likes tea", "hash": "h", "updated_at": "t"}]}
+
+    assert server.select_fields(page, ["memory"]) == {"count": 1, "results": [{"id": "m1", "memory": "likes tea"}]}
+    assert server.select_fields(page, None) is page
+    assert server.select_fields("Error", ["memory"]) == "Error"
@@ -0,0 +1,153 @@
+# Import necessary libraries and modules
+import asyncio
+
+import httpx
+import pytest
+
+import src.service as service_module
+from src.service import AgentService
+
+
+class StubTurns:
+    """Stands in for run_agent_turn: each turn waits for `release`, then answers or raises `error`."""
+
+    def __init__(self, error=None):
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+        self.error = error
+
+    async def __call__(self, user_input, mcp_client, groq_client, session, groq_tools):
+        self.started.set()
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return f"reply to {user_input}"
+
+
+@pytest.fixture
+def agent_service(monkeypatch):
+    service = AgentService(max_sessions=2, max_concurrent_turns=1, admission_timeout=0.05, idle_ttl=60)
+    monkeypatch.setattr(service_module, "service", service)
+    return service
+
+def run_with_client(monkeypatch, stub, scenario):
+    monkeypatch.setattr(service_module, "run_agent_turn", stub)
+
+    async def main():
+        transport = httpx.ASGITransport(app=service_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://service") as client:
+            return await scenario(client)
+
+    return asyncio.run(main())
+
+
+def test_session_limit_is_enforced(agent_service, monkeypatch):
+    async def scenario(client):
+        return [await client.post("/sessions", json={"user_id": "alice"}) for _ in range(3)]
+
+    responses = run_with_client(monkeypatch, None, scenario)
+    assert [r.status_code for r in responses] == [201, 201, 503]
+    assert responses[2].headers["Retry-After"] == "1"
+    assert agent_service.rejected == 1
+
+def test_second_turn_in_a_busy_session_gets_409(agent_service, monkeypatch):
+    stub = StubTurns()
+
+    async def scenario(client):
+        session_id = (await client.post("/sessions")).json()["session_id"]
+        url = f"/sessions/{session_id}/messages"
+        first = asyncio.create_task(client.post(url, json={"content": "hello", "stream": False}))
+        await stub.started.wait()
+        second = await client.post(url, json={"content": "again", "stream": False})
+        stub.release.set()
+        return await first, second
+
+    first, second = run_with_client(monkeypatch, stub, scenario)
+    assert second.status_code == 409
+    assert first.status_code == 200
+    assert first.json()["reply"] == "reply to hello"
+    assert first.json()["session"]["busy"] is False
+
+def test_concurrent_requests_race_for_one_session(agent_service, monkeypatch):
+    stub = StubTurns()
+
+    async def scenario(client):
+        session_id = (await client.post("/sessions")).json()["session_id"]
+        url = f"/sessions/{session_id}/messages"
+        requests = [asyncio.create_task(client.post(url, json={"content": str(i), "stream": False})) for i in range(3)]
+        await stub.started.wait()
+        stub.release.set()
+        return await asyncio.gather(*requests)
+
+    responses = run_with_client(monkeypatch, stub, scenario)
+    assert sorted(r.status_code for r in responses) == [200, 409, 409]
+
+def test_turn_is_rejected_when_no_slot_frees_up(agent_service, monkeypatch):
+    stub = StubTurns()
+
+    async def scenario(client):
+        first_id = (await client.post("/sessions")).json()["session_id"]
+        second_id = (await client.post("/sessions")).json()["session_id"]
+        first = asyncio.create_task(client.post(f"/sessions/{first_id}/messages", json={"content": "hi", "stream": False}))
+        await stub.started.wait()
+        rejected = await client.post(f"/sessions/{second_id}/messages", json={"content": "hi", "stream": False})
+        stub.release.set()
+        await first
+        return rejected, (await client.get(f"/sessions/{second_id}")).json()
+
+    rejected, second = run_with_client(monkeypatch, stub, scenario)
+    assert rejected.status_code == 503
+    assert second["busy"] is False
+    assert agent_service.rejected == 1
+    assert agent_service.active_turns == 0
+
+def test_request_cancelled_while_waiting_for_a_slot_frees_the_session(agent_service, monkeypatch):
+    agent_service.admission_timeout = 5
+    stub = StubTurns()
+
+    async def scenario(client):
+        first_id = (await client.post("/sessions")).json()["session_id"]
+        second_id = (await client.post("/sessions")).json()["session_id"]
+        first = asyncio.create_task(client.post(f"/sessions/{first_id}/messages", json={"content": "hi", "stream": False}))
+        await stub.started.wait()
+        waiting = asyncio.create_task(client.post(f"/sessions/{second_id}/messages", json={"content": "hi", "stream": False}))
+        await asyncio.sleep(0.05)
+        assert agent_service.sessions[second_id].busy
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        busy_after_cancel = agent_service.sessions[second_id].busy
+        stub.release.set()
+        await first
+        retried = await client.post(f"/sessions/{second_id}/messages", json={"content": "again", "stream": False})
+        return busy_after_cancel, retried
+
+    busy_after_cancel, retried = run_with_client(monkeypatch, stub, scenario)
+    assert busy_after_cancel is False
+    assert retried.status_code == 200
+
+def test_streamed_turn_failure_is_reported_as_an_event(agent_service, monkeypatch):
+    stub = StubTurns(error=RuntimeError("groq is down"))
+    stub.release.set()
+
+    async def scenario(client):
+        session_id = (await client.post("/sessions")).json()["session_id"]
+        response = await client.post(f"/sessions/{session_id}/messages", json={"content": "hi"})
+        return response, (await client.get(f"/sessions/{session_id}")).json()
+
+    response, session = run_with_client(monkeypatch, stub, scenario)
+    assert response.status_code == 200
+    assert 'event: error\ndata: {"text": "groq is down"}' in response.text
+    assert response.text.endswith('event: done\ndata: {"text": ""}\n\n')
+    assert session["busy"] is False
+
+def test_unknown_session_and_empty_message(agent_service, monkeypatch):
+    async def scenario(client):
+        session_id = (await client.post("/sessions")).json()["session_id"]
+        return (
+            await client.post("/sessions/missing/messages", json={"content": "hi"}),
+            await client.post(f"/sessions/{session_id}/messages", json={"content": "  "}),
+        )
+
+    missing, empty = run_with_client(monkeypatch, None, scenario)
+    assert missing.status_code == 404
+    assert empty.status_code == 400
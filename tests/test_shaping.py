@@ -0,0 +1,84 @@
+# Import necessary libraries and modules
+import json
+from types import SimpleNamespace
+
+from src.shaping import ResultShaper, extract_payload
+
+
+def text_result(payload, is_error=False):
+    return SimpleNamespace(structured_content=None, content=[SimpleNamespace(text=json.dumps(payload))], is_error=is_error)
+
+
+# Payload Extraction
+def test_structured_result_wrapper_is_removed():
+    assert extract_payload(SimpleNamespace(structured_content={"result": [1, 2]})) == [1, 2]
+    assert extract_payload(SimpleNamespace(structured_content={"count": 2})) == {"count": 2}
+
+def test_text_blocks_are_parsed_as_json_when_possible():
+    blocks = [SimpleNamespace(text='{"a": 1}'), SimpleNamespace(text="plain")]
+    assert extract_payload(SimpleNamespace(structured_content=None, content=blocks)) == [{"a": 1}, "plain"]
+
+
+# Projections
+def test_search_keeps_top_hits_with_clipped_snippets():
+    shaper = ResultShaper(search_top_k=2)
+    hits = [{"title": f"t{i}", "url": f"u{i}", "content": "word " * 100, "raw_content": "x"} for i in range(3)]
+
+    shaped = json.loads(shaper.shape("web_search", text_result({"answer": "42", "results": hits})))
+
+    assert shaped["answer"] == "42"
+    assert [hit["title"] for hit in shaped["results"]] == ["t0", "t1"]
+    assert set(shaped["results"][0]) == {"title", "url", "snippet"}
+    assert len(shaped["results"][0]["snippet"]) == 300 and shaped["results"][0]["snippet"].endswith("...")
+    assert shaped["truncated"].startswith("1 more results omitted")
+
+def test_memories_keep_paging_info_and_drop_empty_fields():
+    shaper = ResultShaper(memory_limit=1)
+    page = {
+        "count": 3, "next_page": 2, "as_of": "2026-01-01T00:00:00Z",
+        "results": [
+            {"id": "m1", "memory": "likes tea", "created_at": "2025-01-01", "hash": "h", "score": None},
+            {"id": "m2", "memory": "lives in Cairo"},
+        ],
+    }
+
+    shaped = json.loads(shaper.shape("get_memories", text_result(page)))
+
+    assert shaped["memories"] == [{"id": "m1", "memory": "likes tea", "updated_at": "2025-01-01"}]
+    assert (shaped["count"], shaped["next_page"], shaped["as_of"]) == (3, 2, "2026-01-01T00:00:00Z")
+    assert shaped["truncated"].startswith("1 more memories omitted")
+
+def test_batch_entries_are_projected_and_errors_pass_through():
+    shaper = ResultShaper()
+    batch = [
+        {"memory_id": "m1", "memory": {"id": "m1", "memory": "likes tea", "hash": "h"}},
+        {"memory_id": "m2", "error": "not found"},
+    ]
+
+    assert json.loads(shaper.shape("get_memory_batch", text_result(batch))) == [
+        {"memory_id": "m1", "memory": {"id": "m1", "memory": "likes tea"}},
+        {"memory_id": "m2", "error": "not found"},
+    ]
+
+def test_error_results_are_not_projected():
+    shaper = ResultShaper()
+
+    assert json.loads(shaper.shape("get_memory", text_result({"error": "Retrieving memory failed"}))) == {"error": "Retrieving memory failed"}
+    assert json.loads(shaper.shape("get_memory", text_result("boom", is_error=True))) == {"error": "boom"}
+
+def test_unknown_tools_are_passed_through():
+    assert ResultShaper().shape("add_short_memory", text_result("Episodic memory (async) scheduled")) == "Episodic memory (async) scheduled"
+
+
+# Truncation
+def test_output_is_capped_at_the_tighter_of_bytes_and_tokens():
+    shaper = ResultShaper(max_bytes=4000, max_tokens=25)
+    text = shaper.truncate("memory_history", "é" * 100)
+
+    kept, marker = text.split("\n")
+    assert shaper.max_bytes == 100
+    assert kept == "é" * 50
+    assert marker == "...[truncated 100 bytes; call `memory_history` with narrower arguments to see more]"
+
+def test_short_output_is_left_alone():
+    assert ResultShaper().truncate("web_search", "short") == "short"
@@ -0,0 +1,133 @@
+# Import necessary libraries and modules
+import asyncio
+
+from src.write_behind import MemoryWriteQueue
+
+
+class RecordingAdd:
+    """Stand-in for the backend's `add`; fails the first `failures` calls."""
+
+    def __init__(self, failures: int = 0):
+        self.calls = []
+        self.failures = failures
+
+    async def __call__(self, messages, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("backend unavailable")
+        self.calls.append((messages, kwargs))
+
+
+def message(text):
+    return {"role": "user", "content": text}
+
+
+def test_writes_with_same_arguments_are_coalesced_into_one_call():
+    add = RecordingAdd()
+
+    async def main():
+        queue = MemoryWriteQueue(add, batch_size=10, flush_interval=60)
+        await queue.enqueue([message("a")], user_id="alice")
+        await queue.enqueue([message("b")], user_id="alice")
+        await queue.enqueue([message("c")], user_id="bob")
+        assert add.calls == []
+        await queue.drain()
+        return queue
+
+    queue = asyncio.run(main())
+    assert sorted(add.calls, key=lambda call: call[1]["user_id"]) == [
+        ([message("a"), message("b")], {"user_id": "alice"}),
+        ([message("c")], {"user_id": "bob"}),
+    ]
+    assert (queue.flushed, queue.pending) == (3, 0)
+
+def test_full_batch_is_flushed_without_waiting_for_the_interval():
+    add = RecordingAdd()
+
+    async def main():
+        queue = MemoryWriteQueue(add, batch_size=2, flush_interval=60)
+        await queue.enqueue([message("a"), message("b")], user_id="alice")
+        await asyncio.sleep(0)
+        assert len(add.calls) == 1
+        await queue.drain()
+
+    asyncio.run(main())
+
+def test_pending_writes_are_visible_until_flushed_and_settled():
+    add = RecordingAdd()
+
+    async def main():
+        queue = MemoryWriteQueue(add, batch_size=10, flush_interval=60, settle_time=0.05)
+        await queue.enqueue([message("a")], user_id="alice")
+        assert queue.pending_for("alice") == [({"user_id": "alice"}, [message("a")])]
+        assert queue.pending_for("bob") == []
+        await queue.drain()
+        # Flushed, but still reported while the backend indexes it
+        assert queue.pending_for("alice") == [({"user_id": "alice"}, [message("a")])]
+        await asyncio.sleep(0.06)
+        assert queue.pending_for("alice") == []
+
+    asyncio.run(main())
+
+def test_failed_flush_is_retried_and_reported():
+    add = RecordingAdd(failures=1)
+    flushed = []
+
+    async def main():
+        queue = MemoryWriteQueue(
+            add, batch_size=10, flush_interval=60, retry_backoff=0,
+            on_flushed=lambda kwargs, write_ids, ok: flushed.append((kwargs, write_ids, ok))
+        )
+        write_id = await queue.enqueue([message("a")], user_id="alice")
+        await queue.drain()
+        return queue, write_id
+
+    queue, write_id = asyncio.run(main())
+    assert len(add.calls) == 1
+    assert flushed == [({"user_id": "alice"}, [write_id], True)]
+    assert queue.dropped == 0
+
+def test_batch_is_dropped_after_max_retries():
+    add = RecordingAdd(failures=5)
+    flushed = []
+
+    async def main():
+        queue = MemoryWriteQueue(
+            add, batch_size=10, flush_interval=60, max_retries=2, retry_backoff=0,
+            on_flushed=lambda kwargs, write_ids, ok: flushed.append(ok)
+        )
+        await queue.enqueue([message("a")], user_id="alice")
+        await queue.drain()
+        return queue
+
+    queue = asyncio.run(main())
+    assert add.calls == []
+    assert queue.dropped == 1
+    assert flushed == [False]
+    assert queue.pending_for("alice") == []
+
+def test_write_waiting_for_space_is_not_lost_when_draining():
+    add = RecordingAdd()
+
+    async def main():
+        queue = MemoryWriteQueue(add, batch_size=10, flush_interval=60, max_pending=1)
+        await queue.enqueue([message("a")], user_id="alice")
+        blocked = asyncio.create_task(queue.enqueue([message("b")], user_id="alice"))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        await queue.drain()
+        await blocked
+
+    asyncio.run(main())
+    assert sorted(call[0][0]["content"] for call in add.calls) == ["a", "b"]
+
+def test_writes_after_drain_are_performed_inline():
+    add = RecordingAdd()
+
+    async def main():
+        queue = MemoryWriteQueue(add)
+        await queue.drain()
+        return await queue.enqueue([message("a")], user_id="alice")
+
+    assert asyncio.run(main()) is None
+    assert add.calls == [([message("a")], {"user_id": "alice"})]